@@ -1,19 +1,22 @@
 from config import config
+from fingerprint import ResultMemo, parse_memo
 from my_logger import logger
 from models import Equity, Options
 
+from typing import Iterable
+
 import polars as pl
 
 
+_frame_memo = ResultMemo()
+
 def add_columns(
         underlying : Equity | None = None,
-        chains : Options | None = None,
+        chains : Options | pl.DataFrame | None = None,
         commission : float = 0.65, 
         acct_margin_req : float = 0.50, 
         m_interest_rate : float = 0.10
     ) -> pl.DataFrame:
-    dividends = 0
-
     if config.use_cache: 
         df = pl.read_csv('./data/chains_df.csv')
         underlying_ask = 200.0        
@@ -25,45 +28,214 @@ def add_columns(
             logger.debug('Chains not provided')
             raise ValueError
 
-        df = pl.from_dicts(chains.to_dictl())  # type: ignore
         underlying_ask = underlying.quote.ask_price  # type: ignore
 
-    logger.info('Adding columns to options chain')
+        # chains parsed from a byte-identical payload reuse the frame built for them last time, the
+        # ask-dependent columns are always recomputed so the memo holds one frame per symbol
+        df = _frame_memo.reuse(
+            getattr(underlying, 'symbol', None),
+            parse_memo.fingerprint_of(chains),
+            lambda: _chains_df(chains)  # type: ignore
+        )
 
+    return _add_columns(df, underlying_ask, commission, m_interest_rate)
 
-    df = df.with_columns(
-        c_breakeven_price = underlying_ask - pl.col('bid') - dividends,
-        c_net_investment = (underlying_ask - pl.col('bid')) * pl.col('multiplier') + commission,
-        m_equity_required = underlying_ask * m_interest_rate,
-    ).with_columns(
-        c_pts_downside_protection = pl.col('bid') - pl.col('c_breakeven_price'),
-        c_profit_if_exercised = (pl.col('strike_price') + dividends) * pl.col('multiplier') - pl.col('c_net_investment'),
-        c_profit_if_unchanged = (underlying_ask + dividends) * pl.col('multiplier') - pl.col('c_net_investment'),
-        m_net_investment = pl.col('m_equity_required') - (pl.col('bid') * pl.col('multiplier')) + commission,
-        m_debit_balance = underlying_ask - pl.col('m_equity_required'),
-    ).with_columns(
-        c_downside_protection = pl.col('c_pts_downside_protection') / underlying_ask,
-        c_return_if_exercised = pl.col('c_profit_if_exercised') / pl.col('c_net_investment'),
-        c_return_if_unchanged = pl.col('c_profit_if_unchanged') / pl.col('c_net_investment'),
-        m_interest_changes = pl.col('m_debit_balance') * m_interest_rate * pl.col('days_to_expiration') / 360,
-        m_profit_if_unchanged = pl.col('c_profit_if_unchanged') - pl.col('m_net_investment'),
-    ).with_columns(
-        c_annualized_return_if_unchanged = 365 * pl.col('c_return_if_unchanged') / pl.col('days_to_expiration'),
-        m_profit_if_exercised = pl.col('c_profit_if_exercised') - pl.col('m_interest_changes'),
-        m_return_if_unchanged = pl.col('m_profit_if_unchanged') / pl.col('m_net_investment'),
-        m_breakeven_price = \
+def _chains_df(chains: Options | pl.DataFrame) -> pl.DataFrame:
+    """
+    Frames from parser.parse_chains_frame are used as-is. Covered metrics assume a standard deliverable,
+    so adjusted/non-standard contracts are dropped.
+    """
+    df = chains if isinstance(chains, pl.DataFrame) else pl.from_dicts(chains.to_dictl())  # type: ignore
+    if 'non_standard' in df.columns:
+        df = df.filter(~pl.col('non_standard').cast(pl.Boolean).fill_null(False))
+    return df
+
+def _metrics(underlying_ask: float | pl.Expr, commission: float, m_interest_rate: float) -> dict[str, pl.Expr]:
+    """ Every add_columns metric in dependency order, each referring to the chain columns and earlier metrics by name """
+    dividends = 0
+    if not isinstance(underlying_ask, pl.Expr):
+        underlying_ask = pl.lit(underlying_ask)
+
+    return {
+        'c_breakeven_price': underlying_ask - pl.col('bid') - dividends,
+        'c_net_investment': (underlying_ask - pl.col('bid')) * pl.col('multiplier') + commission,
+        'm_equity_required': underlying_ask * m_interest_rate,
+        'c_pts_downside_protection': pl.col('bid') - pl.col('c_breakeven_price'),
+        'c_profit_if_exercised': (pl.col('strike_price') + dividends) * pl.col('multiplier') - pl.col('c_net_investment'),
+        'c_profit_if_unchanged': (underlying_ask + dividends) * pl.col('multiplier') - pl.col('c_net_investment'),
+        'm_net_investment': pl.col('m_equity_required') - (pl.col('bid') * pl.col('multiplier')) + commission,
+        'm_debit_balance': underlying_ask - pl.col('m_equity_required'),
+        'c_downside_protection': pl.col('c_pts_downside_protection') / underlying_ask,
+        'c_return_if_exercised': pl.col('c_profit_if_exercised') / pl.col('c_net_investment'),
+        'c_return_if_unchanged': pl.col('c_profit_if_unchanged') / pl.col('c_net_investment'),
+        'm_interest_changes': pl.col('m_debit_balance') * m_interest_rate * pl.col('days_to_expiration') / 360,
+        'm_profit_if_unchanged': pl.col('c_profit_if_unchanged') - pl.col('m_net_investment'),
+        'c_annualized_return_if_unchanged': 365 * pl.col('c_return_if_unchanged') / pl.col('days_to_expiration'),
+        'm_profit_if_exercised': pl.col('c_profit_if_exercised') - pl.col('m_interest_changes'),
+        'm_return_if_unchanged': pl.col('m_profit_if_unchanged') / pl.col('m_net_investment'),
+        'm_breakeven_price': \
                 (pl.col('m_net_investment') + pl.col('m_debit_balance') - (dividends * pl.col('multiplier')) + pl.col('m_interest_changes')) \
                 / pl.col('multiplier'),
-    ).with_columns(
-        m_return_if_exercised = pl.col('m_profit_if_exercised') / pl.col('m_net_investment'),
-        m_pts_downside_protection = underlying_ask - pl.col('m_breakeven_price'),
-        m_annualized_return_if_unchanged = 365 * pl.col('m_return_if_unchanged') / pl.col('days_to_expiration'),
-    ).with_columns(
-        m_downside_protection = pl.col('m_pts_downside_protection') / underlying_ask,
-    )
+        'm_return_if_exercised': pl.col('m_profit_if_exercised') / pl.col('m_net_investment'),
+        'm_pts_downside_protection': underlying_ask - pl.col('m_breakeven_price'),
+        'm_annualized_return_if_unchanged': 365 * pl.col('m_return_if_unchanged') / pl.col('days_to_expiration'),
+        'm_downside_protection': pl.col('m_pts_downside_protection') / underlying_ask,
+    }
+
+METRICS = list(_metrics(0.0, 0.0, 0.0))
+
+def _stages(metrics: dict[str, pl.Expr], selected: Iterable[str]) -> list[dict[str, pl.Expr]]:
+    """
+    The {selected} metrics and the metrics they depend on, grouped into with_columns stages: each stage
+    only refers to the chain columns and the metrics of earlier stages
+    """
+    levels = {}
+
+    def level(name: str) -> int:
+        if name not in levels:
+            deps = [ dep for dep in metrics[name].meta.root_names() if dep in metrics ]
+            levels[name] = 1 + max((level(dep) for dep in deps), default=-1)
+        return levels[name]
+
+    for name in selected:
+        if name not in metrics:
+            raise ValueError(f'Unknown metric {name}')
+        level(name)
+
+    stages = [ {} for _ in range(max(levels.values(), default=-1) + 1) ]
+    for name, expr in metrics.items():
+        if name in levels:
+            stages[levels[name]][name] = expr
+    return stages
+
+def _add_columns(df: pl.DataFrame, underlying_ask: float, commission: float, m_interest_rate: float) -> pl.DataFrame:
+    logger.info('Adding columns to options chain')
+
+    for stage in _stages(_metrics(underlying_ask, commission, m_interest_rate), METRICS):
+        df = df.with_columns(**stage)
 
     return df
 
+def scan_chains(path: str) -> pl.LazyFrame:
+    """ Lazily scans a chain frame written by write_csv/write_parquet, e.g. ./data/chains_df.csv """
+    if path.endswith('.parquet'):
+        return pl.scan_parquet(path)
+    return pl.scan_csv(path)
+
+def add_columns_lazy(
+        chains : pl.LazyFrame | None = None,
+        underlying_ask : float | pl.Expr | None = None,
+        metrics : Iterable[str] | None = None,
+        predicate : pl.Expr | None = None,
+        commission : float = 0.65,
+        acct_margin_req : float = 0.50,
+        m_interest_rate : float = 0.10
+    ) -> pl.LazyFrame:
+    """
+    Lazy add_columns: builds a query plan instead of a frame, so Polars can fuse the metric expressions,
+    push {predicate} and column selection down into the scan, and run on the streaming engine, e.g.
+
+        add_columns_lazy(scan_chains(path), 200.0, ['c_annualized_return_if_unchanged'], pl.col('days_to_expiration') > 0) \
+            .collect(engine='streaming')
+
+    Arguments:
+        chains -- chain frame, e.g. scan_chains(...) or parser.parse_chains_frame(...).lazy(), defaults to
+                  ./data/chains_df.csv when config.use_cache
+        underlying_ask -- ask price of the underlying, or an expression per row (see add_columns_universe),
+                          defaults to 200.0 when config.use_cache
+
+    Keyword Arguments:
+        metrics : Iterable[str] -- subset of METRICS to compute, defaults to all of them. Metrics they depend
+                                   on are computed as well but not returned
+        predicate : pl.Expr -- rows to keep, may refer to chain columns as well as to metrics
+    """
+    if chains is None:
+        if not config.use_cache:
+            logger.debug('Chains not provided')
+            raise ValueError
+        chains = scan_chains('./data/chains_df.csv')
+        underlying_ask = 200.0 if underlying_ask is None else underlying_ask
+    if underlying_ask is None:
+        logger.debug('Underlying ask not provided')
+        raise ValueError
+
+    selected = list(METRICS if metrics is None else metrics)
+    required = selected
+    if predicate is not None:
+        required = selected + [ name for name in predicate.meta.root_names() if name in METRICS ]
+
+    lf = chains
+    stages = _stages(_metrics(underlying_ask, commission, m_interest_rate), required)
+    for stage in stages:
+        lf = lf.with_columns(**stage)
+    if predicate is not None:
+        lf = lf.filter(predicate)
+
+    helpers = [ name for stage in stages for name in stage if name not in selected ]
+    return lf.drop(helpers)
+
+def underlying_quotes(equities: Iterable[Equity]) -> pl.DataFrame:
+    """ Underlying quote table for add_columns_universe from parser.parse_quotes(...) """
+    return pl.DataFrame(
+        {
+            'symbol': [ equity.symbol for equity in equities ],  # type: ignore
+            'underlying_ask': [ equity.quote.ask_price for equity in equities ],  # type: ignore
+        },
+        schema={ 'symbol': pl.String, 'underlying_ask': pl.Float64 }
+    )
+
+def add_columns_universe(
+        chains : pl.DataFrame | pl.LazyFrame,
+        underlyings : pl.DataFrame | pl.LazyFrame | Iterable[Equity],
+        metrics : Iterable[str] | None = None,
+        predicate : pl.Expr | None = None,
+        commission : float = 0.65,
+        acct_margin_req : float = 0.50,
+        m_interest_rate : float = 0.10,
+        engine : str = 'auto'
+    ) -> pl.DataFrame:
+    """
+    add_columns for many underlyings at once: the chain frames of every symbol, concatenated, are joined
+    with their underlying's ask on underlying_symbol and every metric is computed in a single Polars
+    query, instead of one add_columns call and one small frame per symbol. Contracts on alternate roots
+    (e.g. SPXW, NDXP) are kept, adjusted/non-standard contracts are dropped, as in add_columns.
+
+    Arguments:
+        chains -- concatenated parser.parse_chains_frame(...) frames, or a scan of them
+        underlyings -- table with symbol and underlying_ask columns, or the equities to build it from
+                       (see underlying_quotes)
+
+    Keyword Arguments:
+        metrics, predicate : see add_columns_lazy
+        engine : str -- Polars engine to collect on, e.g. 'streaming' for very large universes
+    """
+    if not isinstance(underlyings, (pl.DataFrame, pl.LazyFrame)):
+        underlyings = underlying_quotes(underlyings)
+
+    lf = chains.lazy()
+    if 'non_standard' in lf.collect_schema().names():
+        lf = lf.filter(~pl.col('non_standard').cast(pl.Boolean).fill_null(False))
+
+    logger.info('Adding columns to options chains of universe')
+
+    lf = lf.with_columns(
+        _underlying=pl.col('underlying_symbol').cast(pl.String)
+    ).join(
+        underlyings.lazy().select(_underlying=pl.col('symbol').cast(pl.String), underlying_ask='underlying_ask'),
+        on='_underlying',
+        how='inner'
+    ).drop('_underlying')
+    lf = add_columns_lazy(
+        lf,
+        pl.col('underlying_ask'),
+        metrics,
+        predicate,
+        commission=commission,
+        acct_margin_req=acct_margin_req,
+        m_interest_rate=m_interest_rate
+    )
+    return lf.collect(engine=engine)  # type: ignore
+
 def main():
     df = add_columns()
     print(df)
@@ -0,0 +1,68 @@
+""" Async twin of data_api, running requests and parses on worker threads """
+
+from config import config
+from my_logger import logger
+import data_api
+
+import asyncio
+
+
+# ----- Quotes -----
+
+async def quotes(symbols: list[str], **kwargs):
+    """
+    Get quotes by list of symbols
+    endpoint: /quotes
+    """
+    return await asyncio.to_thread(data_api.quotes, symbols, **kwargs)
+
+# ----- Option Chains -----
+
+async def chains(symbol: str, **kwargs):
+    """
+    Get option chain for an optional symbol
+    endpoint: /chains
+    """
+    return await asyncio.to_thread(data_api.chains, symbol, **kwargs)
+
+async def expirationchain(symbol: str):
+    """
+    Get Option Expiration (Series) information for an optional symbol
+    endpoint: /expirationchain
+    """
+    return await asyncio.to_thread(data_api.expirationchain, symbol)
+
+async def gather_chains(symbols: list[str], max_concurrency: int | None = None, **kwargs) -> dict:
+    """
+    Get option chains for every symbol in a watchlist concurrently. At most {max_concurrency} requests
+    are in flight at a time, so total time is close to that of the slowest request rather than the sum.
+
+    Arguments:
+        symbols -- list of underlying symbols
+
+    Keyword Arguments:
+        max_concurrency : int -- defaults to config.max_concurrency
+        ... -- forwarded to chains(...)
+
+    Returns:
+        dict of symbol -> Options, in the order of {symbols}
+    """
+    limit = asyncio.Semaphore(max_concurrency or config.max_concurrency)
+
+    async def bounded(symbol: str):
+        async with limit:
+            return await chains(symbol, **kwargs)
+
+    logger.info(f'Gathering chains for {len(symbols)} symbols')
+    results = await asyncio.gather(*(bounded(symbol) for symbol in symbols))
+
+    return dict(zip(symbols, results))
+
+# ----- Price History -----
+
+async def pricehistory(symbol: str, **kwargs):
+    """
+    Get historical Open, High, Low, Close, Volume for a given frequency (aggregation)
+    endpoint: /pricehistory
+    """
+    return await asyncio.to_thread(data_api.pricehistory, symbol, **kwargs)
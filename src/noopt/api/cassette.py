@@ -0,0 +1,227 @@
+""" Record/replay of Schwab API responses and a local replay server """
+
+from config import config
+from fingerprint import fingerprint
+from my_logger import logger
+from response_cache import ResponseCache
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import os
+import random
+import threading
+from time import perf_counter, sleep
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+
+
+# hop-by-hop / transfer headers that no longer describe the stored body
+_SKIP_HEADERS = { 'connection', 'content-encoding', 'content-length', 'keep-alive', 'transfer-encoding' }
+
+def _wire_params(params: dict) -> dict:
+    """ {params} as requests sends them: None and empty lists are dropped, list values joined with ',' """
+    return {
+        k: ','.join(map(str, v)) if isinstance(v, (list, tuple)) else str(v)
+        for k, v in params.items()
+        if v is not None and not (isinstance(v, (list, tuple)) and not v)
+    }
+
+def _query_params(query: str) -> dict:
+    """ Params of a request's query string, normalized like _wire_params (repeated keys joined with ',') """
+    return { k: ','.join(v) for k, v in parse_qs(query, keep_blank_values=True).items() }
+
+def _key(method: str, path: str, params: dict) -> tuple:
+    """ {params} must be normalized, see _wire_params and _query_params """
+    return (method.upper(), *ResponseCache.key(path, params))
+
+def _filename(key: tuple) -> str:
+    slug = key[1].strip('/').replace('/', '_') or 'root'
+    return f'{key[0].lower()}_{slug}_{fingerprint(repr(key).encode())[:12]}.json'
+
+def record(method: str, url: str, params: dict, response: requests.Response) -> None:
+    """ Writes {response} to a cassette in config.record_dir, replacing any earlier recording of the request """
+    path = urlsplit(url).path
+    params = _wire_params(params)
+    key = _key(method, path, params)
+    cassette = {
+        'method': key[0],
+        'path': path,
+        'params': params,
+        'status': response.status_code,
+        'headers': { k: v for k, v in response.headers.items() if k.lower() not in _SKIP_HEADERS },
+        'latency': response.elapsed.total_seconds(),
+        'body': response.text
+    }
+
+    os.makedirs(config.record_dir, exist_ok=True)
+    with open(os.path.join(config.record_dir, _filename(key)), 'w') as f:
+        json.dump(cassette, f, indent=2)
+
+def load(directory: str) -> dict[tuple, dict]:
+    """ Loads every cassette in {directory}, keyed on (method, path, normalized params) """
+    cassettes = {}
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith('.json'):
+            continue
+        with open(os.path.join(directory, name), 'r') as f:
+            cassette = json.load(f)
+        cassettes[_key(cassette['method'], cassette['path'], cassette['params'])] = cassette
+
+    logger.info(f'Loaded {len(cassettes)} cassettes from {directory}')
+    return cassettes
+
+class ReplayServer:
+    """
+    Local stand-in for the Schwab endpoints that serves recorded cassettes
+
+    Arguments:
+        directory -- cassette directory written in record mode
+
+    Keyword Arguments:
+        latency : float -- seconds to wait before each response, defaults to the recorded latency
+        latency_scale : float -- multiplier applied to the latency
+        error_rate : float -- probability [0, 1] of answering with {error_status} instead of the cassette
+        error_status : int -- status of simulated errors, e.g. 429 or 503
+        host, port -- port 0 picks a free port
+        seed -- seed of the error generator
+    """
+
+    def __init__(
+            self,
+            directory: str,
+            latency: float | None = None,
+            latency_scale: float = 1.0,
+            error_rate: float = 0.0,
+            error_status: int = 503,
+            host: str = '127.0.0.1',
+            port: int = 0,
+            seed: int | None = None
+        ):
+        self.cassettes = load(directory)
+        self.latency = latency
+        self.latency_scale = latency_scale
+        self.error_rate = error_rate
+        self.error_status = error_status
+
+        self.requests = 0
+        self.errors = 0
+        self.misses = 0
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _reply(self):
+                url = urlsplit(self.path)
+                cassette = server.cassettes.get(_key(self.command, url.path, _query_params(url.query)))
+                status, body, headers, latency = server._respond(cassette)
+
+                sleep(latency)
+                self.send_response(status)
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = do_PUT = do_DELETE = _reply
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def _respond(self, cassette: dict | None) -> tuple[int, bytes, dict, float]:
+        """ Returns (status, body, headers, latency) for a request matching {cassette} """
+        with self._lock:
+            self.requests += 1
+            is_error = self._random.random() < self.error_rate
+            if is_error:
+                self.errors += 1
+            elif cassette is None:
+                self.misses += 1
+
+        latency = self.latency if self.latency is not None else (cassette or {}).get('latency', 0.0)
+        latency *= self.latency_scale
+        json_headers = { 'Content-Type': 'application/json' }
+
+        if is_error:
+            body = json.dumps({ 'errors': [ { 'status': self.error_status, 'title': 'Simulated error' } ] })
+            return self.error_status, body.encode(), json_headers, latency
+        if cassette is None:
+            body = json.dumps({ 'errors': [ { 'status': 404, 'title': 'No cassette for request' } ] })
+            return 404, body.encode(), json_headers, 0.0
+
+        return cassette['status'], cassette['body'].encode(), cassette['headers'], latency
+
+    def start(self) -> 'ReplayServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f'Replay server listening on {self.url}')
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *_):
+        self.stop()
+
+def benchmark(directory: str, symbols: list[str], **kwargs) -> dict:
+    """
+    Fetches chains for {symbols} through chains_many(...) against a ReplayServer of {directory} and
+    reports end-to-end throughput. A symbol whose chain fails is counted in 'failed' and the run goes on.
+    Keyword arguments are forwarded to ReplayServer. The config options changed for the run are restored
+    afterwards.
+    """
+    import data_api
+
+    with ReplayServer(directory, **kwargs) as server:
+        options = { 'base_url': server.url, 'use_cache': False, 'cache_responses': False, 'rate_limit': 0, 'record_dir': '' }
+        previous = { k: getattr(config, k) for k in options }
+        config.configure(**options)
+        try:
+            count = failed = 0
+            start = perf_counter()
+            for symbol, result in data_api.chains_many(symbols, return_exceptions=True):
+                if isinstance(result, Exception):
+                    logger.debug(f'Benchmark chain {symbol} failed: {result!r}')
+                    failed += 1
+                else:
+                    count += 1
+            elapsed = perf_counter() - start
+        finally:
+            config.configure(**previous)
+
+    return {
+        'chains': count,
+        'failed': failed,
+        'seconds': elapsed,
+        'chains_per_second': count / elapsed if elapsed else 0.0,
+        'requests': server.requests,
+        'errors': server.errors,
+        'misses': server.misses
+    }
+
+def main():
+    with open('./data/symbols.txt', 'r') as f:
+        symbols = [ line.strip() for line in f if line.strip() ]
+    print(benchmark('./cassettes', symbols))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+""" Decoders generated per data_schemas model for the trusted decoding path """
+
+from data_schemas import key_map
+from my_logger import logger
+
+from enum import Enum
+from types import NoneType, UnionType
+from typing import Callable, get_args, get_origin, Union
+
+from pydantic import BaseModel
+
+
+_MISSING = object()
+_IMMUTABLE = (str, int, float, bool, type(None))
+
+_decoders: dict[type, Callable[[dict], BaseModel]] = {}
+_stale: set[type] = set()
+
+def _coercion(annotation, names: dict, depth: int = 0) -> str | None:
+    """ Expression converting {v{depth}} to {annotation}, or None if the value is passed through """
+    v = f'v{depth}'
+    if annotation is float:
+        return f'(float({v}) if type({v}) is int else {v})'
+    if isinstance(annotation, type) and issubclass(annotation, Enum):
+        name = names.setdefault(annotation, f'_enum{len(names)}')
+        return f'{name}.get({v}, {v})'
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        name = names.setdefault(annotation, f'_model{len(names)}')
+        return f'({name}({v}) if type({v}) is dict else {v})'
+
+    origin, args = get_origin(annotation), get_args(annotation)
+    if origin in (Union, UnionType) and len(args) == 2 and NoneType in args:
+        # every coercion passes None through
+        return _coercion(next(arg for arg in args if arg is not NoneType), names, depth)
+    if origin is list and args and (inner := _coercion(args[0], names, depth + 1)):
+        return f'([ {inner} for v{depth + 1} in {v} ] if type({v}) is list else {v})'
+    if origin is dict and len(args) == 2 and (inner := _coercion(args[1], names, depth + 1)):
+        return f'({{ k{depth + 1}: {inner} for k{depth + 1}, v{depth + 1} in {v}.items() }} if type({v}) is dict else {v})'
+    return None
+
+def _source(model: type[BaseModel], keys: dict, names: dict) -> str:
+    fields = model.model_fields
+
+    lines = [
+        'def decode(data):',
+        '    get = data.get',
+        '    values = {}',
+        '    n = 0',
+    ]
+    for key, name in sorted(keys.items()):
+        if name not in fields:
+            lines.append(f'    n += {key!r} in data')
+            continue
+
+        coercion = _coercion(fields[name].annotation, names)
+        lines += [
+            f'    v0 = get({key!r}, _MISSING)',
+            '    if v0 is not _MISSING:',
+            '        n += 1',
+            f'        values[{name!r}] = {coercion or "v0"}',
+        ]
+    lines += [
+        '    if n != len(data):',
+        '        _learn(data, values)',
+    ]
+
+    if not _direct(model):
+        lines.append('    return _construct(**values)')
+        return '\n'.join(lines)
+
+    # same object model_construct builds, without its per-field loop
+    lines.append('    fields_set = set(values)')
+    for name, field in fields.items():
+        if not field.is_required():
+            lines.append(f'    if {name!r} not in fields_set: values[{name!r}] = {field.default!r}')
+    lines += [
+        '    obj = _new(_model)',
+        "    _set(obj, '__dict__', values)",
+        "    _set(obj, '__pydantic_fields_set__', fields_set)",
+        "    _set(obj, '__pydantic_extra__', None)",
+        f"    _set(obj, '__pydantic_private__', {'{}' if model.__private_attributes__ else 'None'})",
+        '    return obj',
+    ]
+    return '\n'.join(lines)
+
+def _direct(model: type[BaseModel]) -> bool:
+    """ True if decoded {model}s can be built without model_construct: no extras, factories or private defaults """
+    if model.model_config.get('extra') == 'allow':
+        return False
+    for field in model.model_fields.values():
+        if field.default_factory is not None:
+            return False
+        if not field.is_required() and not isinstance(field.default, _IMMUTABLE):
+            return False
+    return model.model_construct().__pydantic_private__ in (None, {})
+
+def _namespace(names: dict) -> dict:
+    """ Globals of generated code: enum name lookups and nested decoders """
+    namespace = {}
+    for annotation, name in names.items():
+        if issubclass(annotation, Enum):
+            namespace[name] = { member.name: member for member in annotation }
+        else:
+            namespace[name] = _lazy(annotation)
+    return namespace
+
+def _compile(model: type[BaseModel]):
+    model.model_rebuild()
+
+    keys = dict(key_map(model))
+    names = {}
+    source = _source(model, keys, names)
+    namespace = {
+        **_namespace(names),
+        '_MISSING': _MISSING,
+        '_construct': model.model_construct,
+        '_model': model,
+        '_new': object.__new__,
+        '_set': object.__setattr__,
+        '_learn': lambda data, values: _learn(model, keys, data, values),
+    }
+    exec(compile(source, f'<decoder {model.__name__}>', 'exec'), namespace)
+    decode = namespace['decode']
+    decode.__source__ = source
+    return decode
+
+def _lazy(model: type[BaseModel]):
+    """ Nested decoders are resolved per call, so they pick up regenerated versions """
+    return lambda data: decoder(model)(data)
+
+def _learn(model: type[BaseModel], compiled: dict, data: dict, values: dict) -> None:
+    """ Slow path for keys not {compiled} into the decoder: translate through the KeyMap, then regenerate """
+    keys = key_map(model)
+    fields = model.model_fields
+
+    for key, value in data.items():
+        if key in compiled:
+            continue
+        name = keys[key]
+        if name in fields:
+            names = {}
+            coercion = _coercion(fields[name].annotation, names)
+            if coercion is None:
+                values[name] = value
+            else:
+                values[name] = _compile_expr(coercion, names)(value)
+
+    logger.info(f'Regenerating decoder for {model.__name__}')
+    _stale.add(model)
+
+def _compile_expr(coercion: str, names: dict):
+    return eval(f'lambda v0: {coercion}', _namespace(names))
+
+def decoder(model: type[BaseModel]):
+    """ Returns the generated decode function of {model}, compiling it on first use """
+    if model in _stale:
+        _stale.discard(model)
+        _decoders.pop(model, None)
+
+    decode = _decoders.get(model)
+    if decode is None:
+        decode = _decoders[model] = _compile(model)
+    return decode
+
+__all__ = ['decoder']
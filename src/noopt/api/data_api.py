@@ -1,9 +1,24 @@
+from config import config
+from fingerprint import fingerprint, parse_memo
+import parse_pool
 from parser import *
-from shared_api import APICategory, api_request, str_format
+from response_cache import ResponseCache
+from shared_api import APICategory, api_request, api_stream, chunk_symbols, str_format
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterator
+
+import polars as pl
 
 
 def _market_data_request(endpoint: str, params: dict = {}):
-    api_request(APICategory.DATA, endpoint, params=params)
+    return api_request(APICategory.DATA, endpoint, params=params)
+
+def _parse_unchanged(endpoint: str, params: dict, parse):
+    """ Requests {endpoint} and parses it, reusing the previous result if the payload is byte-identical """
+    response, digest = api_request(APICategory.DATA, endpoint, params=params, with_fingerprint=True)
+    key = (parse.__name__, *ResponseCache.key(endpoint, params))
+    return parse_memo.reuse(key, digest, lambda: parse(response))
 
 # ----- Quotes -----
 
@@ -12,20 +27,48 @@ def quotes(symbols: list[str], **kwargs):
     Get quotes by list of symbols
     endpoint: /quotes
 
+    Large symbol lists are split into chunks (see shared_api.chunk_symbols) that are requested in
+    parallel and merged into a single result.
+
     Arguments:
         symbols -- list of symbols to retrieve quotes for
 
     Keyword Arguments:
         fields -- { quote, fundamental, extended, reference, regular, *all }
         indicative : bool --
+        chunk_size : int -- max symbols per request, defaults to config.quotes_chunk_size
+        max_workers : int -- max chunks in flight, defaults to config.max_concurrency
     """
-    params = parse_kwargs({
-        'symbols': str_format(symbols),
-        'fields': kwargs.get('fields'),
-        'indicative': kwargs.get('indicative'),
-    })
-    response = _market_data_request('/quotes', params=params)
-    equities = parse_quotes(response)
+    chunks = chunk_symbols(
+        symbols,
+        kwargs.get('chunk_size', config.quotes_chunk_size),
+        config.quotes_max_length
+    )
+
+    def params(chunk: list[str]) -> dict:
+        return parse_kwargs({
+            'symbols': str_format(chunk),
+            'fields': kwargs.get('fields'),
+            'indicative': kwargs.get('indicative'),
+        })
+
+    def request(chunk: list[str]) -> tuple[dict, str]:
+        return api_request(APICategory.DATA, '/quotes', params=params(chunk), with_fingerprint=True)
+
+    if len(chunks) > 1:
+        max_workers = min(len(chunks), kwargs.get('max_workers', config.max_concurrency))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            responses = list(executor.map(request, chunks))
+    else:
+        responses = [ request(chunk) for chunk in chunks ]
+
+    response = {}
+    for chunk_response, _ in responses:
+        response.update(chunk_response)
+    digest = fingerprint(''.join(chunk_digest for _, chunk_digest in responses).encode())
+
+    key = (parse_quotes.__name__, *ResponseCache.key('/quotes', params(symbols)))
+    equities = parse_memo.reuse(key, digest, lambda: parse_quotes(response))
     return equities
 
 def quote(symbol: str, fields: str | list[str] = ''):
@@ -44,6 +87,27 @@ def quote(symbol: str, fields: str | list[str] = ''):
 
 # ----- Option Chains -----
 
+def _chains_params(symbol: str, **kwargs) -> dict:
+    return parse_kwargs({
+        'symbol': symbol,
+        'contractType': kwargs.get('contract_type', 'ALL'),
+        'strikeCount': kwargs.get('strike_count', 5),
+        'includeUnderlyingQuote': kwargs.get('include_underlying_quote', False),
+        'strategy': kwargs.get('strategy'),
+        'interval': kwargs.get('interval'),
+        'strike': kwargs.get('strike'),
+        'range': kwargs.get('range'),
+        'fromDate': kwargs.get('from_date'),
+        'toDate': kwargs.get('to_date'),
+        'volatility': kwargs.get('volatility'),
+        'underlyingPrice': kwargs.get('underlying_price'),
+        'interest_rate': kwargs.get('interest_rate'),
+        'daysToExpiration': kwargs.get('days_to_expiration'),
+        'expMonth': kwargs.get('expiration_month'),
+        'optionType': kwargs.get('option_type'),
+        'entitlement': kwargs.get('entitlement')
+    })
+
 def chains(symbol: str, **kwargs):
     """
     Get option chain for an optional symbol
@@ -70,29 +134,126 @@ def chains(symbol: str, **kwargs):
         option_type : str -- 
         entitlement : str -- { PN, NP, PP }
     """
-    params = parse_kwargs({
-        'symbol': symbol,
-        'contractType': kwargs.get('contract_type', 'ALL'),
-        'strikeCount': kwargs.get('strike_count', 5),
-        'includeUnderlyingQuote': kwargs.get('include_underlying_quote', False),
-        'strategy': kwargs.get('strategy'),
-        'interval': kwargs.get('interval'),
-        'strike': kwargs.get('strike'),
-        'range': kwargs.get('range'),
-        'fromDate': kwargs.get('from_date'),
-        'toDate': kwargs.get('to_date'),
-        'volatility': kwargs.get('volatility'),
-        'underlyingPrice': kwargs.get('underlying_price'),
-        'interest_rate': kwargs.get('interest_rate'),
-        'daysToExpiration': kwargs.get('days_to_expiration'),
-        'expMonth': kwargs.get('expiration_month'),
-        'optionType': kwargs.get('option_type'),
-        'entitlement': kwargs.get('entitlement')
-    })
-    response = _market_data_request('/chains', params=params)
-    chains = parse_chains(response)
+    params = _chains_params(symbol, **kwargs)
+    chains = _parse_unchanged('/chains', params, parse_pool.parse_chains)
     return chains
 
+def chains_frame(symbol: str, **kwargs) -> pl.DataFrame:
+    """
+    Get option chain for an optional symbol as a DataFrame with one row per contract (see
+    parser.parse_chains_frame)
+    endpoint: /chains
+
+    Keyword Arguments:
+        see chains(...)
+    """
+    params = _chains_params(symbol, **kwargs)
+    chains = _parse_unchanged('/chains', params, parse_chains_frame)
+    return chains
+
+def chains_arrays(symbol: str, **kwargs) -> OptionChainArrays:
+    """
+    Get option chain for an optional symbol as per-column NumPy arrays (see chain_arrays.OptionChainArrays)
+    endpoint: /chains
+
+    Keyword Arguments:
+        see chains(...)
+    """
+    params = _chains_params(symbol, **kwargs)
+    chains = _parse_unchanged('/chains', params, parse_chains_arrays)
+    return chains
+
+def chains_index(symbol: str, **kwargs) -> ChainIndex:
+    """
+    Get every contract of the option chain for an optional symbol, including adjusted/non-standard
+    contracts and alternate roots, keyed by (option root, expiration, strike, put/call) (see
+    chain_index.ChainIndex). Served from the response cache if the chain was just requested.
+    endpoint: /chains
+
+    Keyword Arguments:
+        see chains(...)
+    """
+    params = _chains_params(symbol, **kwargs)
+    chains = _parse_unchanged('/chains', params, parse_chains_index)
+    return chains
+
+def option_chain(symbol: str, **kwargs) -> OptionChain:
+    """
+    Get option chain for an optional symbol decoded into the data_schemas.OptionChain schema, validated
+    according to config.validation (see parser.parse_option_chain)
+    endpoint: /chains
+
+    Keyword Arguments:
+        see chains(...)
+    """
+    params = _chains_params(symbol, **kwargs)
+    chains = _parse_unchanged('/chains', params, parse_option_chain)
+    return chains
+
+def chains_stream(symbol: str, batch_size: int = 1000, **kwargs) -> Iterator[Options]:
+    """
+    Get option chain for an optional symbol, parsed incrementally as the response streams in. Intended
+    for deep chains (e.g. $SPX) where materializing the full response would use tens of MB.
+    endpoint: /chains
+
+    Arguments:
+        symbol -- single symbol
+        batch_size -- approximate number of contracts per yielded Options
+
+    Keyword Arguments:
+        see chains(...)
+    """
+    params = _chains_params(symbol, **kwargs)
+    yield from parse_chains_stream(api_stream(APICategory.DATA, '/chains', params=params), batch_size)
+
+def chains_many(symbols: list[str], **kwargs) -> Iterator[tuple[str, Options]]:
+    """
+    Get option chains for a list of underlyings across a worker pool, yielding each result as soon as
+    it is parsed (i.e., in completion order, not the order of {symbols})
+
+    Arguments:
+        symbols -- list of underlying symbols
+
+    Keyword Arguments:
+        max_workers : int -- max requests in flight, defaults to config.max_concurrency
+        return_exceptions : bool -- yield (symbol, exception) for a failed symbol instead of raising, defaults to False
+        ... -- forwarded to chains(...)
+
+    Yields:
+        (symbol, Options)
+    """
+    max_workers = kwargs.pop('max_workers', config.max_concurrency)
+    return_exceptions = kwargs.pop('return_exceptions', False)
+    yield from _many(chains, symbols, max_workers, return_exceptions, **kwargs)
+
+def chains_frame_many(symbols: list[str], **kwargs) -> Iterator[tuple[str, pl.DataFrame]]:
+    """
+    chains_many(...), parsed into one DataFrame per underlying (see chains_frame)
+
+    Yields:
+        (symbol, DataFrame)
+    """
+    max_workers = kwargs.pop('max_workers', config.max_concurrency)
+    return_exceptions = kwargs.pop('return_exceptions', False)
+    yield from _many(chains_frame, symbols, max_workers, return_exceptions, **kwargs)
+
+def _many(fetch, symbols: list[str], max_workers: int, return_exceptions: bool, **kwargs) -> Iterator[tuple]:
+    """
+    Runs fetch(symbol, **kwargs) for every symbol across a worker pool, yielding in completion order.
+    With {return_exceptions}, a symbol whose fetch raised yields (symbol, exception) and the rest keep going.
+    """
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = { executor.submit(fetch, symbol, **kwargs): symbol for symbol in symbols }
+        for future in as_completed(futures):
+            exception = future.exception()
+            if exception is not None and return_exceptions:
+                yield futures[future], exception
+            else:
+                yield futures[future], future.result()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
 def expirationchain(symbol: str):
     """
     Get Option Expiration (Series) information for an optional symbol. Does not include individual
@@ -103,8 +264,7 @@ def expirationchain(symbol: str):
         symbol 
     """
     params = parse_kwargs({ 'symbol': symbol })
-    response = _market_data_request('/expirationchain', params=params)
-    expiration_chain = parse_expiration_chain(response)
+    expiration_chain = _parse_unchanged('/expirationchain', params, parse_expiration_chain)
     return expiration_chain
 
 # ----- Price History -----
@@ -136,7 +296,7 @@ def pricehistory(symbol: str, **kwargs):
         'symbol': symbol,
         'periodType': kwargs.get('period_type')
     })
-    _ = _market_data_request('/pricehistory', params=params)
+    return _market_data_request('/pricehistory', params=params)
 
 # ----- Movers -----
 
@@ -83,6 +83,10 @@ class MutualFundAssetSubType(Enum):
     NONE = auto()
     OEF = auto()
 
+class PutCall(Enum):
+    CALL = auto()
+    PUT = auto()
+
 class QuoteType(Enum):
     NBBO = auto()  # realtime
     NFL = auto()   # Non-fee liable quote
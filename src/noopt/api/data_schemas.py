@@ -5,8 +5,9 @@ from data_enums import *
 
 from functools import wraps
 import re
+from typing import Iterable
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class Candle(BaseModel):
@@ -193,8 +194,10 @@ class OptionResponse(Response, BaseModel):
     reference: ReferenceOption
 
 class Quote(BaseModel):
-    _52_week_high: float
-    _52_week_low: float
+    model_config = ConfigDict(validate_by_name=True)
+
+    high_52_week: float = Field(validation_alias='52WeekHigh')  # a leading _ would make it a private attribute
+    low_52_week: float = Field(validation_alias='52WeekLow')
     close_price: float
     high_price: float
     last_price: float
@@ -270,8 +273,10 @@ class QuoteFutureOption(Quote, AskBid, BaseModel):
     tick_amount: float
 
 class QuoteIndex(BaseModel):
-    _52_week_high: float
-    _52_week_low: float
+    model_config = ConfigDict(validate_by_name=True)
+
+    high_52_week: float = Field(validation_alias='52WeekHigh')
+    low_52_week: float = Field(validation_alias='52WeekLow')
     close_price: float
     high_price: float
     last_price: float
@@ -284,8 +289,10 @@ class QuoteIndex(BaseModel):
     trade_time: int
 
 class QuoteMutualFund(BaseModel):
-    _52_week_high: float
-    _52_week_low: float
+    model_config = ConfigDict(validate_by_name=True)
+
+    high_52_week: float = Field(validation_alias='52WeekHigh')
+    low_52_week: float = Field(validation_alias='52WeekLow')
     close_price: float
     n_av: float  # net asset value
     net_change: float
@@ -422,17 +429,22 @@ class ErrorSource(BaseModel):
     pointer: list[str]  # list of attributes which lead to this error message
 
 class OptionChain(BaseModel):
-    call_exp_date_map: dict[str, OptionContractMap]
+    asset_main_type: AssetMainType | None = None
+    asset_sub_type: EquityAssetSubType | None = None
+    call_exp_date_map: dict[str, dict[str, list[OptionContract]]]  # expiration -> strike -> contracts
     days_to_expiration: float
+    dividend_yield: float | None = None
     interest_rate: float
     interval: float
+    is_chain_truncated: bool | None = None
     is_delayed: bool
     is_index: bool
-    put_exp_date_map: dict[str, OptionContractMap]
+    number_of_contracts: int | None = None
+    put_exp_date_map: dict[str, dict[str, list[OptionContract]]]
     status: str
     strategy: Strategy
     symbol: str
-    underlying: Underlying
+    underlying: Underlying | None = None  # only with includeUnderlyingQuote
     underlying_price: float
     volatility: float
 
@@ -465,15 +477,19 @@ class Underlying(BaseModel):
     trade_time: int
 
 class OptionDeliverables(BaseModel):
-    asset_type: AssetType
-    currency_type: str
-    deliverable_units: str
+    asset_type: str  # e.g. STOCK
+    currency_type: str | None = None
+    deliverable_units: float
     symbol: str
 
 class OptionContract(BaseModel):
-    ask_price: float
+    """ Fields whose wire name does not translate to the field name carry it as validation_alias """
+    model_config = ConfigDict(validate_by_name=True)
+
+    ask_price: float = Field(validation_alias='ask')
     ask_size: int
-    bid_price: float
+    bid_ask_size: str  # e.g. 44X2
+    bid_price: float = Field(validation_alias='bid')
     bid_size: int
     close_price: float
     days_to_expiration: int
@@ -481,31 +497,35 @@ class OptionContract(BaseModel):
     delta: float
     description: str
     exchange_name: str
+    exercise_type: ExerciseType
     expiration_date: str
     expiration_type: ExpirationType
+    extrinsic_value: float
     gamma: float
+    high_52_week: float
     high_price: float
     intrinsic_value: float
-    is_in_the_money: bool
-    is_index_option: bool
-    is_mini: bool
-    is_non_standard: bool
-    is_penny_pilot: bool
-    last_price: float
+    is_in_the_money: bool = Field(validation_alias='inTheMoney')
+    is_index_option: bool | None = None
+    is_mini: bool = Field(validation_alias='mini')
+    is_non_standard: bool = Field(validation_alias='nonStandard')
+    is_penny_pilot: bool = Field(validation_alias='pennyPilot')
+    last_price: float = Field(validation_alias='last')
     last_size: int
     last_trading_day: int
+    low_52_week: float
     low_price: float
     mark_change: float
     mark_percent_change: float
-    mark_price: float
+    mark_price: float = Field(validation_alias='mark')
     multiplier: float
     net_change: float
     open_interest: float
     open_price: float
-    option_deliberables_list: list[OptionDeliverables]
+    option_deliberables_list: list[OptionDeliverables] = Field(validation_alias='optionDeliverablesList')
     option_root: str
     percent_change: float
-    put_call: ContractType  
+    put_call: PutCall
     quote_time_in_long: int 
     rho: float
     settlement_type: SettlementType
@@ -516,7 +536,7 @@ class OptionContract(BaseModel):
     theta: float
     time_value: float
     total_volume: int
-    trade_date: int
+    trade_date: int | None = None
     trade_time_in_long: int
     vega: float
     volatility: float
@@ -567,9 +587,9 @@ def to_snake_case(name: str) -> str:
     3.         -> a_BC_De_01
     4.         -> a_bc_de_01 
     """
-    name = re.sub(r'(?<=[a-z0-9], [A-Z])', r'_\1', name)
+    name = re.sub(r'(?<=[a-z0-9])([A-Z])', r'_\1', name)
     name = re.sub(r'([0-9]+)', r'_\1', name)
-    name = re.sub(r'([A-Z]{2,}, [A-Z][a-z])', r'\1_\2', name)
+    name = re.sub(r'([A-Z]{2,})([A-Z][a-z])', r'\1_\2', name)
     name = name.lower()
 
     if name and name[0].isdigit():
@@ -577,6 +597,44 @@ def to_snake_case(name: str) -> str:
     
     return name
 
+def to_camel_case(name: str) -> str:
+    """ Inverse of to_snake_case for names that round trip, e.g. ask_mic_id -> askMicId, _52_week_high -> 52WeekHigh """
+    head, *tail = name.lstrip('_').split('_')
+    return head + ''.join(part[:1].upper() + part[1:] for part in tail)
+
+class KeyMap(dict):
+    """
+    camelCase -> snake_case translation table of a single schema. Seeded from the schema's field names
+    and wire-name aliases, and extended with to_snake_case(key) the first time an unknown key is seen,
+    so the regexes run at most once per distinct key instead of once per key of every record.
+    """
+
+    def __init__(self, names: Iterable[str] = (), aliases: dict[str, str] = {}):
+        super().__init__()
+        for name in names:
+            camel = to_camel_case(name)
+            if to_snake_case(camel) == name:
+                self[camel] = name
+        self.update(aliases)
+
+    def __missing__(self, key: str) -> str:
+        snake_key = self[key] = to_snake_case(key)
+        return snake_key
+
+_key_maps: dict[type, KeyMap] = {}
+
+def key_map(cls: type) -> KeyMap:
+    """ Returns the (shared) KeyMap of {cls}, built on first use """
+    table = _key_maps.get(cls)
+    if table is None:
+        fields = getattr(cls, 'model_fields', None)
+        if fields:
+            aliases = { field.validation_alias: name for name, field in fields.items() if isinstance(field.validation_alias, str) }
+            table = _key_maps[cls] = KeyMap(fields, aliases)
+        else:
+            table = _key_maps[cls] = KeyMap(getattr(cls, '__annotations__', {}))
+    return table
+
 def _to_dict(obj) -> dict:
     """
     """
@@ -595,13 +653,13 @@ def base_init(cls):
     decorator that overwrites the class's __init__ to support camel to snake case conversions
     """
     original = getattr(cls, '__init__', None)
+    keys = key_map(cls)
 
     @wraps(original)  # type: ignore
     def init(self, **kwargs):
         for key, value in kwargs.items():
-            snake_key = to_snake_case(key)
             try:
-                setattr(self, snake_key, value)
+                setattr(self, keys[key], value)
             except AttributeError:
                 pass
     
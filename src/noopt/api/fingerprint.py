@@ -0,0 +1,68 @@
+from collections import OrderedDict
+from hashlib import blake2b
+import threading
+
+
+def fingerprint(body: bytes) -> str:
+    """ Digest of a raw response body, equal digests mean byte-identical payloads """
+    return blake2b(body, digest_size=16).hexdigest()
+
+class ResultMemo:
+    """
+    Remembers the last result computed for each key along with the fingerprint of the payload it was
+    computed from. While the fingerprint is unchanged the previous result is returned as-is, so
+    parse/analysis stages are skipped for byte-identical responses (e.g. after hours, illiquid names).
+
+    Keyword Arguments:
+        maxsize : int -- number of keys remembered, the least recently used are evicted beyond it
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (fingerprint, result), least recently used first
+        self._fingerprints = {}        # id(result) -> fingerprint
+
+        self.hits = 0
+        self.misses = 0
+
+    def reuse(self, key, digest: str | None, compute):
+        """ Returns the result stored for {key} if {digest} matches, otherwise compute() and store it """
+        if digest is None:
+            return compute()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == digest:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        result = compute()
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._fingerprints.pop(id(previous[1]), None)
+            self._entries[key] = (digest, result)
+            self._fingerprints[id(result)] = digest
+
+            while len(self._entries) > self.maxsize:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._fingerprints.pop(id(evicted), None)
+
+        return result
+
+    def fingerprint_of(self, result) -> str | None:
+        """ Fingerprint of the payload {result} was computed from, None if it is not memoized """
+        with self._lock:
+            return self._fingerprints.get(id(result))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._fingerprints.clear()
+
+parse_memo = ResultMemo()
+__all__ = ['ResultMemo', 'fingerprint', 'parse_memo']
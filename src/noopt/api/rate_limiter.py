@@ -0,0 +1,96 @@
+""" Prioritized token-bucket rate limiter shared by every API request """
+
+from config import config
+
+import heapq
+import itertools
+import threading
+from time import monotonic
+
+
+class RateLimiter:
+    """
+    Token bucket shared by every request made through shared_api.api_request. Tokens refill at
+    config.rate_limit per minute up to config.rate_limit_burst. Callers waiting for a token are served
+    in priority order (lower first), then first-come-first-served within a priority.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._waiters = []  # heap of (priority, seq)
+        self._seq = itertools.count()
+
+        self._tokens = float(config.rate_limit_burst)
+        self._last_refill = monotonic()
+
+        self._queued = {}
+        self._acquired = {}
+        self._wait_time = {}
+        self._max_wait_time = {}
+
+    def _refill(self, now: float) -> None:
+        rate = config.rate_limit / 60
+        self._tokens = min(float(config.rate_limit_burst), self._tokens + (now - self._last_refill) * rate)
+        self._last_refill = now
+
+    def acquire(self, priority: int = 0, name: str = 'default') -> float:
+        """
+        Blocks until a token is available to the caller, returning the time spent waiting in seconds.
+        Returns immediately when config.rate_limit is 0 (disabled).
+        """
+        if not config.rate_limit:
+            return 0.0
+
+        start = monotonic()
+        with self._condition:
+            entry = (priority, next(self._seq))
+            heapq.heappush(self._waiters, entry)
+            self._queued[name] = self._queued.get(name, 0) + 1
+            try:
+                while True:
+                    now = monotonic()
+                    self._refill(now)
+                    if self._waiters[0] == entry and self._tokens >= 1:
+                        self._tokens -= 1
+                        break
+                    timeout = None
+                    if self._waiters[0] == entry:
+                        timeout = (1 - self._tokens) / (config.rate_limit / 60)
+                    self._condition.wait(timeout)
+            finally:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._queued[name] -= 1
+                self._condition.notify_all()
+
+            waited = monotonic() - start
+            self._acquired[name] = self._acquired.get(name, 0) + 1
+            self._wait_time[name] = self._wait_time.get(name, 0.0) + waited
+            self._max_wait_time[name] = max(self._max_wait_time.get(name, 0.0), waited)
+
+        return waited
+
+    def stats(self) -> dict:
+        """
+        Snapshot of the scheduler per priority class
+            queue_depth -- callers currently waiting for a token
+            acquired -- tokens handed out
+            avg_wait_time, max_wait_time -- seconds spent waiting for a token
+        """
+        with self._condition:
+            self._refill(monotonic())
+
+            result = { 'tokens': self._tokens, 'queue_depth': len(self._waiters) }
+            for name, queued in self._queued.items():
+                acquired = self._acquired.get(name, 0)
+                result[name] = {
+                    'queue_depth': queued,
+                    'acquired': acquired,
+                    'avg_wait_time': self._wait_time.get(name, 0.0) / acquired if acquired else 0.0,
+                    'max_wait_time': self._max_wait_time.get(name, 0.0)
+                }
+
+        return result
+
+rate_limiter = RateLimiter()
+__all__ = ['RateLimiter', 'rate_limiter']
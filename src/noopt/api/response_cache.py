@@ -0,0 +1,93 @@
+""" In-memory TTL/LRU cache of decoded market data responses """
+
+from config import config
+
+from collections import OrderedDict
+import threading
+from time import monotonic
+
+
+class ResponseCache:
+    """
+    In-memory cache of decoded market data responses, keyed on endpoint and normalized params. Entries
+    expire after the TTL configured for their endpoint (config.cache_ttls) and the least recently used
+    entries are evicted once the cached response bodies exceed config.cache_max_bytes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at, size, response)
+        self._size = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def ttl(endpoint: str) -> float:
+        """ Seconds a response of {endpoint} stays fresh, 0 if it should not be cached """
+        ttls = config.cache_ttls
+        for part in reversed(endpoint.strip('/').split('/')):
+            if part in ttls:
+                return ttls[part]
+        return 0
+
+    @staticmethod
+    def key(endpoint: str, params: dict) -> tuple:
+        """ Params are order-independent and compared by their string form """
+        return (endpoint, tuple(sorted((str(k), str(v)) for k, v in params.items())))
+
+    def get(self, endpoint: str, params: dict):
+        """ Returns the cached response, or None on a miss """
+        key = self.key(endpoint, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, endpoint: str, params: dict, response, size: int) -> None:
+        """ Caches {response}, whose raw body was {size} bytes, if its endpoint has a TTL """
+        ttl = self.ttl(endpoint)
+        if ttl <= 0 or size > config.cache_max_bytes:
+            return
+
+        key = self.key(endpoint, params)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (monotonic() + ttl, size, response)
+            self._size += size
+
+            while self._size > config.cache_max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._size -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+response_cache = ResponseCache()
+__all__ = ['ResponseCache', 'response_cache']
@@ -0,0 +1,60 @@
+from config import config
+from my_logger import logger
+
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+_lock = threading.Lock()
+_session: requests.Session | None = None
+_session_key: tuple | None = None
+
+def _pool_key() -> tuple:
+    """ Snapshot of the config options the pooled session is built from """
+    return (config.pool_connections, config.pool_maxsize)
+
+def _build_session() -> requests.Session:
+    """
+    Creates a keep-alive session whose adapter pools connections per host. The adapter does not retry,
+    shared_api retries 429/5xx itself so every attempt goes through the rate limiter.
+    """
+    adapter = HTTPAdapter(
+        pool_connections=config.pool_connections,
+        pool_maxsize=config.pool_maxsize
+    )
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+def get_session() -> requests.Session:
+    """
+    Returns the process-wide pooled session, shared by every data_api and trader_api call. The session
+    is rebuilt whenever the pool options passed to config.configure(...) change.
+    """
+    global _session, _session_key
+
+    key = _pool_key()
+    with _lock:
+        if _session is None or _session_key != key:
+            if _session is not None:
+                logger.info('Pool configuration changed, rebuilding HTTP session')
+                _session.close()
+            _session = _build_session()
+            _session_key = key
+    return _session
+
+def close_session() -> None:
+    """ Closes all pooled connections """
+    global _session, _session_key
+
+    with _lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+        _session_key = None
+
+__all__ = ['close_session', 'get_session']
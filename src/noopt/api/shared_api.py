@@ -1,8 +1,16 @@
 from auth import auth_manager
 from config import config
+import cassette
+from fingerprint import fingerprint
+import json_backend
+from rate_limiter import rate_limiter
+from response_cache import response_cache
+from session import get_session
 
 from enum import Enum
-import json
+from functools import partial
+from time import sleep
+from typing import Iterator
 
 import requests
 
@@ -23,32 +31,127 @@ class APICategory(Enum):
     DATA = 'data'
     TRADER = 'trader'
 
-_base_url = 'https://api.schwabapi.com'
-_marketdata_base = f'{_base_url}/marketdata/v1'
-_trader_base = f'{_base_url}/'
+# appended to config.base_url
+_marketdata_path = '/marketdata/v1'
+_trader_path = '/trader/v1'
+
+# trader calls (orders) are scheduled ahead of bulk market data scans
+_priority = {
+    APICategory.TRADER: 0,
+    APICategory.DATA: 1
+}
 
 def str_format(symbols: str | list[str]) -> str:
     """ Formats list of symbols into API-compatible format """
-    return ','.join(symbols) if isinstance(symbols, list) else str  # type: ignore
+    return ','.join(symbols) if isinstance(symbols, list) else symbols
+
+def chunk_symbols(symbols: list[str], max_symbols: int, max_length: int) -> list[list[str]]:
+    """
+    Splits symbols into chunks of at most {max_symbols} symbols whose str_format(...) is at most
+    {max_length} characters, so each request stays under URL-length and server limits
+    """
+    chunks, chunk, length = [], [], 0
+    for symbol in symbols:
+        added = len(symbol) + (1 if chunk else 0)
+        if chunk and (len(chunk) >= max_symbols or length + added > max_length):
+            chunks.append(chunk)
+            chunk, length, added = [], 0, len(symbol)
+        chunk.append(symbol)
+        length += added
+    if chunk:
+        chunks.append(chunk)
+
+    return chunks
+
+_RETRY_STATUSES = (429, 500, 502, 503, 504)
+_RETRY_METHODS = ('DELETE', 'GET', 'HEAD', 'OPTIONS', 'PUT')  # idempotent, an order is never POSTed twice
+
+def _backoff(attempt: int, raw: requests.Response | None) -> float:
+    """ Seconds to wait before retry {attempt} (0-based), honoring a Retry-After header in seconds """
+    retry_after = raw.headers.get('Retry-After', '') if raw is not None else ''
+    if retry_after.isdigit():
+        return float(retry_after)
+    return config.backoff_factor * 2 ** attempt
+
+def _request(method: str, url: str, **kwargs) -> requests.Response:
+    return get_session().request(
+        method,
+        url,
+        headers={'Authorization': f'Bearer {auth_manager.access_token}'},
+        timeout=auth_manager.request_timeout,
+        **kwargs
+    )
+
+def _send(api: APICategory, method: str, url: str, **kwargs) -> requests.Response:
+    """
+    Sends a request, retrying connection errors and 429/5xx of idempotent methods up to
+    config.max_retries times. Every attempt acquires its own rate limiter token, so retries count
+    against config.rate_limit like any request. The last response is returned as-is once retries are
+    exhausted.
+    """
+    retries = config.max_retries if method.upper() in _RETRY_METHODS else 0
+    for attempt in range(retries):
+        rate_limiter.acquire(_priority[api], api.value)
+        try:
+            raw = _request(method, url, **kwargs)
+        except requests.ConnectionError:
+            sleep(_backoff(attempt, None))
+            continue
 
-def api_request(api: APICategory, endpoint: str, params: dict = {}):
+        if raw.status_code not in _RETRY_STATUSES:
+            return raw
+        raw.close()
+        sleep(_backoff(attempt, raw))
+
+    rate_limiter.acquire(_priority[api], api.value)
+    return _request(method, url, **kwargs)
+
+def _base_url(api: APICategory) -> str:
     match api:
         case APICategory.DATA:
-            pass
+            return f'{config.base_url}{_marketdata_path}'
         case APICategory.TRADER:
-            pass
+            return f'{config.base_url}{_trader_path}'
 
+def api_request(api: APICategory, endpoint: str, params: dict = {}, method: str = 'GET', with_fingerprint: bool = False):
+    """
+    Sends a request to the Schwab API and returns the decoded response. With {with_fingerprint}, returns
+    (response, fingerprint) where fingerprint is a digest of the raw response body. Raises
+    requests.HTTPError if the request still fails once retries are exhausted.
+    """
     if config.use_cache:
-        with open(f'./data{endpoint}.json', 'r') as f:
-            response = json.loads(f.read())
+        with open(f'./data{endpoint}.json', 'rb') as f:
+            body = f.read()
+        response, digest = json_backend.loads(body), fingerprint(body)
     else:
-        response = requests.get(
-            f'{_marketdata_base}{endpoint}',
-            headers={'Authorization': f'Bearer {auth_manager.access_token}'},
-            params=params,
-            timeout=auth_manager.request_timeout
-        )
-        response = response.json()
+        cacheable = config.cache_responses and api is APICategory.DATA and method == 'GET'
+        if cacheable and (cached := response_cache.get(endpoint, params)) is not None:
+            response, digest = cached
+            return (response, digest) if with_fingerprint else response
+
+        raw = _send(api, method, f'{_base_url(api)}{endpoint}', params=params)
+        if config.record_dir:
+            cassette.record(method, raw.url, params, raw)
+
+        # retries are exhausted by now, an error body is not data
+        raw.raise_for_status()
+        response, digest = json_backend.loads(raw.content), fingerprint(raw.content)
 
-    return response
+        if cacheable:
+            response_cache.put(endpoint, params, (response, digest), len(raw.content))
+
+    return (response, digest) if with_fingerprint else response
+
+def api_stream(api: APICategory, endpoint: str, params: dict = {}, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    """
+    Sends a GET request to the Schwab API and yields the raw response body in chunks of {chunk_size}
+    bytes instead of materializing it. Streamed responses are neither cached nor recorded.
+    """
+    if config.use_cache:
+        with open(f'./data{endpoint}.json', 'rb') as f:
+            yield from iter(partial(f.read, chunk_size), b'')
+        return
 
+    with _send(api, 'GET', f'{_base_url(api)}{endpoint}', params=params, stream=True) as raw:
+        raw.raise_for_status()
+        yield from raw.iter_content(chunk_size)
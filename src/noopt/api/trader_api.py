@@ -3,7 +3,7 @@ from parser import parse_kwargs
 
 
 def _trader_request(endpoint: str, request_type: str = 'GET', params: dict = {}):
-    api_request(APICategory.TRADER, endpoint, params=params)
+    return api_request(APICategory.TRADER, endpoint, params=params, method=request_type)
 
 # ----- Common Arguments -----
 
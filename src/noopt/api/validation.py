@@ -0,0 +1,102 @@
+""" Trusted/strict decoding of camelCase API payloads into the data_schemas models """
+
+from codegen import decoder
+from config import config
+from data_schemas import OptionChain, OptionContract, QuoteEquity, key_map
+
+from enum import Enum
+from functools import cache
+from types import NoneType, UnionType
+from typing import Any, get_args, get_origin, Union
+
+from pydantic import BaseModel, TypeAdapter
+
+
+def _shape(annotation) -> tuple | None:
+    """
+    How to decode a field: ('model', cls), ('enum', members by name), ('list', shape), ('dict', shape),
+    or None to keep the raw value
+    """
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return ('model', annotation)
+    if isinstance(annotation, type) and issubclass(annotation, Enum):
+        return ('enum', { member.name: member for member in annotation })
+
+    origin, args = get_origin(annotation), get_args(annotation)
+    if origin in (Union, UnionType) and len(args) == 2 and NoneType in args:
+        return _shape(next(arg for arg in args if arg is not NoneType))
+    if origin is list and args:
+        inner = _shape(args[0])
+        return ('list', inner) if inner else None
+    if origin is dict and len(args) == 2:
+        inner = _shape(args[1])
+        return ('dict', inner) if inner else None
+    return None
+
+@cache
+def _plan(model: type[BaseModel]) -> tuple[dict, dict]:
+    """ (key map, shapes of the nested fields) of {model}, computed once """
+    model.model_rebuild()
+    shapes = {}
+    for name, field in model.model_fields.items():
+        shape = _shape(field.annotation)
+        if shape is not None:
+            shapes[name] = shape
+    return key_map(model), shapes
+
+@cache
+def _adapter(model: type[BaseModel], many: bool = False) -> TypeAdapter:
+    _plan(model)
+    return TypeAdapter(list[model] if many else model)
+
+def _snake(model: type[BaseModel], data: dict, construct: bool):
+    """
+    Translates {data} to snake_case keys, recursing into nested models, optionally constructing them.
+    Reflective reference for the generated decoders.
+    """
+    keys, shapes = _plan(model)
+
+    values = {}
+    for key, value in data.items():
+        name = keys[key]
+        shape = shapes.get(name)
+        values[name] = value if shape is None else _apply(shape, value, construct)
+
+    return model.model_construct(**values) if construct else values
+
+def _apply(shape: tuple, value: Any, construct: bool):
+    kind, inner = shape
+    if kind == 'model':
+        return _snake(inner, value, construct) if isinstance(value, dict) else value
+    if kind == 'enum':
+        # the API sends member names, unknown names are left for validation to reject
+        return inner.get(value, value) if isinstance(value, str) else value
+    if kind == 'list':
+        return [ _apply(inner, v, construct) for v in value ] if isinstance(value, list) else value
+    return { k: _apply(inner, v, construct) for k, v in value.items() } if isinstance(value, dict) else value
+
+def decode(model: type[BaseModel], data: dict) -> BaseModel:
+    """ Decodes a single camelCase payload into {model} according to config.validation """
+    if config.validation == 'strict':
+        return _adapter(model).validate_python(_snake(model, data, construct=False))
+    return decoder(model)(data)
+
+def decode_many(model: type[BaseModel], records: list[dict]) -> list:
+    """ Decodes a batch of camelCase payloads into {model}, validating the whole batch in one call if strict """
+    if config.validation == 'strict':
+        return _adapter(model, many=True).validate_python([ _snake(model, data, construct=False) for data in records ])
+    decode_one = decoder(model)
+    return [ decode_one(data) for data in records ]
+
+def prebuild(*models: type[BaseModel]) -> None:
+    """ Builds the key maps, field shapes and validators of {models} ahead of the first decode """
+    for model in models:
+        _plan(model)
+        decoder(model)
+        _adapter(model)
+        _adapter(model, many=True)
+
+# bulk market data ingest
+prebuild(OptionChain, OptionContract, QuoteEquity)
+
+__all__ = ['decode', 'decode_many', 'prebuild']
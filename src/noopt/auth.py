@@ -1,5 +1,6 @@
 from models import *
 from my_logger import logger
+from session import get_session
 from parser import *
 
 from base64 import b64encode
@@ -124,7 +125,7 @@ class _AuthManager:
         message = 'updating' if self._is_refresh_token_valid() else 'initializing'
         logger.info(f'POST: {message} access token')
 
-        response: requests.Response = requests.post(
+        response: requests.Response = get_session().post(
             url=f'{self._oauth_base}/token',
             headers=headers,
             data=data
@@ -0,0 +1,185 @@
+""" Micro-benchmarks of the hot paths over the sample payloads in /data """
+
+from codegen import decoder
+from config import config
+from data_schemas import (
+    EquityResponse, ExtendedMarket, Fundamental, OptionChain, OptionContract, QuoteEquity, ReferenceEquity,
+    RegularMarket, key_map, to_snake_case
+)
+import json_backend
+import parse_pool
+import parser
+import validation
+
+from datetime import timedelta
+from enum import Enum
+import json
+import os
+from timeit import repeat
+
+from pydantic import BaseModel
+
+
+def _best(fn, number: int) -> float:
+    return min(repeat(fn, number=number, repeat=5)) / number
+
+def _report(name: str, baseline: float, optimized: float) -> dict:
+    return {
+        'benchmark': name,
+        'baseline_us': baseline * 1e6,
+        'optimized_us': optimized * 1e6,
+        'speedup': baseline / optimized if optimized else float('inf')
+    }
+
+def json_decode(path: str = './data/chains.json', number: int = 200) -> dict:
+    """ stdlib json.loads vs json_backend.loads """
+    with open(path, 'rb') as f:
+        body = f.read()
+
+    baseline = _best(lambda: json.loads(body), number)
+    optimized = _best(lambda: json_backend.loads(body), number)
+    return _report(f'json_decode[{json_backend.backend}]', baseline, optimized)
+
+def json_encode(path: str = './data/chains.json', number: int = 200) -> dict:
+    """ stdlib json.dumps vs json_backend.dumps, as used by my_logger.JSONFormatter """
+    with open(path, 'rb') as f:
+        obj = json.loads(f.read())
+
+    baseline = _best(lambda: json.dumps(obj, default=str), number)
+    optimized = _best(lambda: json_backend.dumps(obj, default=str), number)
+    return _report(f'json_encode[{json_backend.backend}]', baseline, optimized)
+
+def _quote_records(path: str) -> list[tuple[type, dict]]:
+    schemas = {
+        'extended': ExtendedMarket,
+        'fundamental': Fundamental,
+        'quote': QuoteEquity,
+        'reference': ReferenceEquity,
+        'regular': RegularMarket
+    }
+    with open(path, 'rb') as f:
+        response = json.loads(f.read())
+
+    records = []
+    for equity in response.values():
+        records.append((EquityResponse, equity))
+        records.extend((schemas[k], v) for k, v in equity.items() if k in schemas)
+    return records
+
+def _chain_records(path: str) -> list[tuple[type, dict]]:
+    with open(path, 'rb') as f:
+        response = json.loads(f.read())
+
+    return [
+        (OptionContract, contract)
+        for key in ('callExpDateMap', 'putExpDateMap')
+        for strikes in response[key].values()
+        for contracts in strikes.values()
+        for contract in contracts
+    ]
+
+def key_translation(path: str, load_records, number: int = 200) -> dict:
+    """ to_snake_case on every key of every record vs the per-schema key_map(...) tables """
+    records = load_records(path)
+
+    def baseline():
+        for _, record in records:
+            { to_snake_case(k): v for k, v in record.items() }
+
+    def optimized():
+        for schema, record in records:
+            keys = key_map(schema)
+            { keys[k]: v for k, v in record.items() }
+
+    return _report(f'key_translation[{path.rpartition("/")[2]}]', _best(baseline, number), _best(optimized, number))
+
+def _normalized(value):
+    """ Comparable form of a decoded value: models as dicts, enums by name """
+    if isinstance(value, BaseModel):
+        return { k: _normalized(v) for k, v in value.__dict__.items() }
+    if isinstance(value, Enum):
+        return value.name
+    if isinstance(value, dict):
+        return { k: _normalized(v) for k, v in value.items() }
+    if isinstance(value, list):
+        return [ _normalized(v) for v in value ]
+    return value
+
+def verify_decoders(records) -> None:
+    """ Asserts the generated decoders build the same models as the reflective path """
+    for schema, record in records:
+        generated = _normalized(decoder(schema)(record))
+        reflective = _normalized(validation._snake(schema, record, construct=True))
+        assert generated == reflective, f'{schema.__name__}: {generated} != {reflective}'
+
+def generated_decoders(path: str, load_records, number: int = 100) -> dict:
+    """ Reflective key translation + model_construct vs the generated decoders in codegen.py """
+    records = load_records(path)
+    verify_decoders(records)
+
+    def baseline():
+        for schema, record in records:
+            validation._snake(schema, record, construct=True)
+
+    def optimized():
+        for schema, record in records:
+            decoder(schema)(record)
+
+    return _report(f'generated_decoders[{path.rpartition("/")[2]}]', _best(baseline, number), _best(optimized, number))
+
+def _option_chain_records(path: str) -> list[tuple[type, dict]]:
+    with open(path, 'rb') as f:
+        return [ (OptionChain, json.loads(f.read())) ]
+
+def _scaled_chain(path: str, contracts: int) -> dict:
+    """ The chain at {path}, its expirations repeated under later dates until it holds at least {contracts} contracts """
+    with open(path, 'rb') as f:
+        response = json.loads(f.read())
+
+    dates = [ parser.expiration_date(key) for key in response['callExpDateMap'] ]
+    span = timedelta(days=(max(dates) - min(dates)).days + 1)
+    size = sum(len(data) for key in ('callExpDateMap', 'putExpDateMap') for strikes in response[key].values() for data in strikes.values())
+
+    for key in ('callExpDateMap', 'putExpDateMap'):
+        original = response[key]
+        response[key] = {
+            f'{parser.expiration_date(expr_date_str) + span * n:%Y-%m-%d}:{expr_date_str.partition(":")[2]}': strikes
+            for n in range(-(-contracts // size))
+            for expr_date_str, strikes in original.items()
+        }
+    return response
+
+def parse_pool_chains(path: str = './data/chains.json', processes: int = os.cpu_count() or 1, number: int = 5) -> dict:
+    """ parser.parse_chains vs parse_pool.parse_chains across {processes} workers, on a chain of config.parse_threshold contracts """
+    response = _scaled_chain(path, config.parse_threshold)
+
+    previous = config.parse_processes
+    config.configure(parse_processes=processes)
+    try:
+        assert len(parse_pool.parse_chains(response)) == len(parser.parse_chains(response))  # also starts the workers
+        baseline = _best(lambda: parser.parse_chains(response), number)
+        optimized = _best(lambda: parse_pool.parse_chains(response), number)
+    finally:
+        parse_pool.close_pool()
+        config.configure(parse_processes=previous)
+
+    return _report(f'parse_pool_chains[{processes}]', baseline, optimized)
+
+def main():
+    results = (
+        json_decode(),
+        json_encode(),
+        key_translation('./data/quotes.json', _quote_records),
+        key_translation('./data/chains.json', _chain_records),
+        generated_decoders('./data/quotes.json', _quote_records),
+        generated_decoders('./data/chains.json', _option_chain_records),
+        parse_pool_chains(),
+    )
+    for result in results:
+        print(
+            f"{result['benchmark']:<32} {result['baseline_us']:>10.1f}us {result['optimized_us']:>10.1f}us "
+            f"{result['speedup']:>6.2f}x"
+        )
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+from datetime import date
+
+import numpy as np
+import polars as pl
+
+
+# (response key, column, dtype) of the contract fields kept by OptionChainArrays
+ARRAY_COLUMNS = [
+    ('strikePrice', 'strike_price', np.float64),
+    ('bid', 'bid', np.float64),
+    ('ask', 'ask', np.float64),
+    ('last', 'last', np.float64),
+    ('mark', 'mark', np.float64),
+    ('bidSize', 'bid_size', np.int32),
+    ('askSize', 'ask_size', np.int32),
+    ('totalVolume', 'total_volume', np.int32),
+    ('openInterest', 'open_interest', np.int32),
+    ('volatility', 'volatility', np.float32),
+    ('delta', 'delta', np.float32),
+    ('gamma', 'gamma', np.float32),
+    ('theta', 'theta', np.float32),
+    ('vega', 'vega', np.float32),
+    ('rho', 'rho', np.float32),
+    ('theoreticalOptionValue', 'theoretical_option_value', np.float64),
+    ('intrinsicValue', 'intrinsic_value', np.float64),
+    ('extrinsicValue', 'extrinsic_value', np.float64),
+    ('daysToExpiration', 'days_to_expiration', np.int16),
+    ('multiplier', 'multiplier', np.float32),
+    ('nonStandard', 'non_standard', np.uint8),  # 0/1, Polars copies np.bool_ into a bitmap
+]
+
+CALL, PUT = 0, 1
+
+class OptionChainArrays:
+    """
+    Compact option chain: one contiguous NumPy array per field (see ARRAY_COLUMNS) instead of a Python
+    object per contract. Expirations and put/call are stored as small integer codes into
+    {expirations} and (CALL, PUT).
+
+    Rows are grouped by expiration, so expiration(...) returns zero-copy views, and to_polars() wraps
+    the arrays without copying them.
+    """
+
+    def __init__(self, symbol: str, expirations: np.ndarray, offsets: np.ndarray, put_call: np.ndarray, columns: dict[str, np.ndarray]):
+        self.symbol = symbol
+        self.expirations = expirations  # datetime64[D], sorted
+        self.offsets = offsets          # rows of expirations[i] are offsets[i]:offsets[i + 1]
+        self.put_call = put_call        # int8 codes, CALL or PUT
+        self.columns = columns
+
+        self.expiration_code = np.repeat(
+            np.arange(len(expirations), dtype=np.int16),
+            np.diff(offsets)
+        )
+
+    @classmethod
+    def from_response(cls, response: dict) -> 'OptionChainArrays':
+        """ Builds the arrays from a /chains response in two passes (count, then fill) """
+        maps = ((CALL, response['callExpDateMap']), (PUT, response['putExpDateMap']))
+
+        by_expiration = {}
+        for code, exp_date_map in maps:
+            for expr_date_str, contracts in exp_date_map.items():
+                rows = by_expiration.setdefault(expr_date_str.partition(':')[0], [])
+                rows.extend((code, contract) for data in contracts.values() for contract in data)
+
+        keys = sorted(by_expiration)
+        counts = [ len(by_expiration[key]) for key in keys ]
+        offsets = np.zeros(len(keys) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+
+        rows = [ row for key in keys for row in by_expiration[key] ]
+        put_call = np.fromiter((code for code, _ in rows), dtype=np.int8, count=len(rows))
+        columns = {}
+        for key, name, dtype in ARRAY_COLUMNS:
+            missing = np.nan if np.issubdtype(dtype, np.floating) else 0
+            columns[name] = np.fromiter(
+                (missing if (value := data.get(key)) is None else value for _, data in rows),
+                dtype=dtype,
+                count=len(rows)
+            )
+
+        return cls(
+            response.get('symbol', ''),
+            np.array(keys, dtype='datetime64[D]'),
+            offsets,
+            put_call,
+            columns
+        )
+
+    def __len__(self) -> int:
+        return len(self.put_call)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (self.expirations, self.offsets, self.put_call, self.expiration_code, *self.columns.values())
+        return sum(array.nbytes for array in arrays)
+
+    def expiration(self, expiration: date | str | np.datetime64) -> dict[str, np.ndarray]:
+        """ Zero-copy views of every column for a single expiration """
+        i = int(np.searchsorted(self.expirations, np.datetime64(expiration, 'D')))
+        if i == len(self.expirations) or self.expirations[i] != np.datetime64(expiration, 'D'):
+            raise KeyError(f'{self.symbol} has no expiration {expiration}')
+
+        rows = slice(self.offsets[i], self.offsets[i + 1])
+        return {
+            'put_call': self.put_call[rows],
+            **{ name: array[rows] for name, array in self.columns.items() }
+        }
+
+    def to_polars(self) -> pl.DataFrame:
+        """
+        Zero-copy DataFrame of the arrays. expiration_code and put_call stay integer codes; decode with
+        pl.col('expiration_code').replace_strict(...) or join on expirations_frame() when needed.
+        non_standard stays UInt8, cast with pl.col('non_standard').cast(pl.Boolean).
+        """
+        return pl.DataFrame({
+            'expiration_code': self.expiration_code,
+            'put_call': self.put_call,
+            **self.columns
+        })
+
+    def expirations_frame(self) -> pl.DataFrame:
+        """ expiration_code -> expiration lookup table """
+        return pl.DataFrame({
+            'expiration_code': np.arange(len(self.expirations), dtype=np.int16),
+            'expiration': self.expirations
+        })
+
+__all__ = ['CALL', 'OptionChainArrays', 'PUT']
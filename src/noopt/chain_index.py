@@ -0,0 +1,103 @@
+""" Every contract of a chain indexed by option root, expiration, strike and put/call """
+
+from models import Contract
+
+from datetime import date, datetime
+from typing import Iterator
+
+
+ContractKey = tuple[str, date, float, str]  # (option root, expiration, strike, put/call)
+
+def _date(expiration: date | str) -> date:
+    """ Normalizes an expiration: date, datetime, 'yyyy-MM-dd' or an expiration map key, e.g. '2025-05-30:0' """
+    if isinstance(expiration, datetime):
+        return expiration.date()
+    if isinstance(expiration, date):
+        return expiration
+    return datetime.strptime(expiration.partition(':')[0], '%Y-%m-%d').date()
+
+class ChainIndex:
+    """
+    Every contract of a chain keyed by (option root, expiration, strike, put/call), including the
+    adjusted/non-standard contracts and alternate roots listed next to the standard contract at a strike.
+    Deliverables are kept alongside, so non-standard contracts can be looked up or filtered out without
+    refetching the chain.
+    """
+
+    def __init__(self, symbol: str, contracts: dict[ContractKey, Contract], deliverables: dict[ContractKey, str], non_standard: set[ContractKey]):
+        self.symbol = symbol
+        self.contracts = contracts
+        self.deliverables = deliverables  # deliverable note, e.g. '100 AAPL'
+        self.non_standard = non_standard
+
+    @classmethod
+    def from_response(cls, response: dict, factory=Contract) -> 'ChainIndex':
+        """ Indexes every contract at every strike of a /chains response, building each with {factory} """
+        contracts, deliverables, non_standard = {}, {}, set()
+        for exp_date_map in (response['callExpDateMap'], response['putExpDateMap']):
+            for expr_date_str, strikes in exp_date_map.items():
+                expiration = _date(expr_date_str)
+                for data in strikes.values():
+                    for contract in data:
+                        key = (contract.get('optionRoot', ''), expiration, float(contract['strikePrice']), contract.get('putCall'))
+                        contracts[key] = factory(**contract)
+                        deliverables[key] = contract.get('deliverableNote', '')
+                        if contract.get('nonStandard'):
+                            non_standard.add(key)
+
+        return cls(response.get('symbol', ''), contracts, deliverables, non_standard)
+
+    def __len__(self) -> int:
+        return len(self.contracts)
+
+    def __contains__(self, key: ContractKey) -> bool:
+        return key in self.contracts
+
+    def __getitem__(self, key: ContractKey) -> Contract:
+        return self.contracts[key]
+
+    def get(self, root: str, expiration: date | str, strike: float, put_call: str) -> Contract | None:
+        """
+        Looks up a single contract
+
+        Arguments:
+            root -- option root, e.g. AAPL or AAPL1 for an adjusted contract
+            expiration -- date, 'yyyy-MM-dd' or expiration map key
+            strike -- strike price
+            put_call -- { CALL, PUT }
+        """
+        return self.contracts.get((root, _date(expiration), float(strike), put_call))
+
+    def roots(self) -> list[str]:
+        """ Option roots present in the chain, standard root first """
+        roots = { root for root, _, _, _ in self.contracts }
+        return sorted(roots, key=lambda root: (root != self.symbol, root))
+
+    def filter(self, root: str | None = None, expiration: date | str | None = None, put_call: str | None = None,
+               non_standard: bool | None = None, deliverable: str | None = None) -> Iterator[tuple[ContractKey, Contract]]:
+        """
+        Iterates over the (key, contract) pairs matching every criteria given
+
+        Keyword Arguments:
+            root : str -- option root
+            expiration : date | str -- expiration date
+            put_call : str -- { CALL, PUT }
+            non_standard : bool -- True for only adjusted/non-standard contracts, False for only standard ones
+            deliverable : str -- deliverable note, e.g. '100 AAPL'
+        """
+        expiration = None if expiration is None else _date(expiration)
+        for key, contract in self.contracts.items():
+            key_root, key_expiration, _, key_put_call = key
+            if root is not None and key_root != root:
+                continue
+            if expiration is not None and key_expiration != expiration:
+                continue
+            if put_call is not None and key_put_call != put_call:
+                continue
+            if non_standard is not None and (key in self.non_standard) != non_standard:
+                continue
+            if deliverable is not None and self.deliverables[key] != deliverable:
+                continue
+            yield key, contract
+
+__all__ = ['ChainIndex', 'ContractKey']
@@ -4,7 +4,32 @@ class _Config:
         self._params = {
             'use_cache': True,
             'verbose': False,
-            'write_on_response': True
+            'write_on_response': True,
+            'pool_connections': 10,
+            'pool_maxsize': 10,
+            'max_retries': 3,
+            'backoff_factor': 0.5,
+            'max_concurrency': 8,
+            'quotes_chunk_size': 250,
+            'quotes_max_length': 2000,
+            'rate_limit': 120,
+            'rate_limit_burst': 10,
+            'base_url': 'https://api.schwabapi.com',
+            'record_dir': '',
+            'validation': 'trusted',
+            'parse_processes': 0,
+            'parse_threshold': 5000,
+            'cache_responses': True,
+            'cache_max_bytes': 64 * 1024 * 1024,
+            'cache_ttls': {
+                'quotes': 5,
+                'chains': 15,
+                'movers': 60,
+                'pricehistory': 60 * 60,
+                'markets': 60 * 60,
+                'expirationchain': 6 * 60 * 60,
+                'instruments': 24 * 60 * 60
+            }
         }
 
     @property
@@ -24,6 +49,95 @@ class _Config:
     def write_on_response(self):
         return self._params.get('write_on_response')
 
+    @property
+    def pool_connections(self):
+        """ Number of per-host connection pools kept by the shared HTTP session """
+        return self._params.get('pool_connections')
+
+    @property
+    def pool_maxsize(self):
+        """ Maximum number of keep-alive connections kept per host """
+        return self._params.get('pool_maxsize')
+
+    @property
+    def max_retries(self):
+        """ Number of retries on connection errors and 429/5xx responses """
+        return self._params.get('max_retries')
+
+    @property
+    def backoff_factor(self):
+        """ Exponential backoff between retries: {backoff_factor} * 2 ** (retry - 1) seconds """
+        return self._params.get('backoff_factor')
+
+    @property
+    def max_concurrency(self):
+        """ Maximum number of requests in flight when fanning out over many symbols """
+        return self._params.get('max_concurrency')
+
+    @property
+    def quotes_chunk_size(self):
+        """ Maximum number of symbols sent in a single /quotes request """
+        return self._params.get('quotes_chunk_size')
+
+    @property
+    def quotes_max_length(self):
+        """ Maximum length of the comma-separated symbols parameter of a single /quotes request """
+        return self._params.get('quotes_max_length')
+
+    @property
+    def rate_limit(self):
+        """ Maximum sustained requests per minute across all API calls, 0 disables rate limiting """
+        return self._params.get('rate_limit')
+
+    @property
+    def rate_limit_burst(self):
+        """ Maximum number of requests that may be sent back-to-back before rate limiting applies """
+        return self._params.get('rate_limit_burst')
+
+    @property
+    def base_url(self):
+        """ Root of the Schwab API, point at a cassette.ReplayServer to run offline """
+        return self._params.get('base_url')
+
+    @property
+    def record_dir(self):
+        """ When set, every network response is recorded to a cassette in this directory """
+        return self._params.get('record_dir')
+
+    @property
+    def validation(self):
+        """
+        How payloads are decoded into the pydantic schemas (see validation.py)
+            trusted -- construct models without per-field validation
+            strict -- fully validate every model, useful when debugging schema mismatches
+        """
+        return self._params.get('validation')
+
+    @property
+    def parse_processes(self):
+        """ Worker processes used to parse large chain responses (see parse_pool.py), 0 parses in-process """
+        return self._params.get('parse_processes')
+
+    @property
+    def parse_threshold(self):
+        """ Minimum number of contracts in a chain response before it is parsed across processes """
+        return self._params.get('parse_threshold')
+
+    @property
+    def cache_responses(self):
+        """ Keep market data responses in memory (see shared_api.response_cache) until their TTL expires """
+        return self._params.get('cache_responses')
+
+    @property
+    def cache_max_bytes(self):
+        """ Memory cap on cached response bodies, least recently used responses are evicted first """
+        return self._params.get('cache_max_bytes')
+
+    @property
+    def cache_ttls(self):
+        """ Seconds a response stays cached by endpoint name, endpoints not listed are never cached """
+        return self._params.get('cache_ttls')
+
     def configure(self, **kwargs):
         for k, v in kwargs.items():
             if self._params.get(k) is None:
@@ -0,0 +1,48 @@
+""" JSON backend for responses and logs: orjson or msgspec when installed, the standard library otherwise """
+
+import json
+
+
+def _stdlib_loads(data: bytes | str):
+    return json.loads(data)
+
+def _stdlib_dumps(obj, default=None) -> str:
+    return json.dumps(obj, default=default)
+
+try:
+    import orjson
+
+    def loads(data: bytes | str):
+        return orjson.loads(data)
+
+    def dumps(obj, default=None) -> str:
+        try:
+            return orjson.dumps(obj, default=default, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+        except TypeError:  # e.g. integers wider than 64 bits
+            return _stdlib_dumps(obj, default=default)
+
+    backend = 'orjson'
+
+except ImportError:
+    try:
+        import msgspec
+
+        _decoder = msgspec.json.Decoder()
+
+        def loads(data: bytes | str):
+            return _decoder.decode(data)
+
+        def dumps(obj, default=None) -> str:
+            try:
+                return msgspec.json.encode(obj, enc_hook=default).decode('utf-8')
+            except (TypeError, msgspec.EncodeError):
+                return _stdlib_dumps(obj, default=default)
+
+        backend = 'msgspec'
+
+    except ImportError:
+        loads = _stdlib_loads
+        dumps = _stdlib_dumps
+        backend = 'json'
+
+__all__ = ['backend', 'dumps', 'loads']
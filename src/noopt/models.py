@@ -0,0 +1,82 @@
+""" Plain objects built from API responses, camelCase keys stored as snake_case attributes """
+
+from collections import defaultdict
+from datetime import datetime
+from functools import lru_cache
+import re
+
+
+_WORD_BOUNDARY = re.compile(r'(?<=[a-z])(?=[A-Z0-9])|(?<=[0-9])(?=[A-Za-z])')
+
+@lru_cache(maxsize=1024)
+def snake_case(key: str) -> str:
+    """
+    Converts a response key to an attribute name, e.g. 'tradeTimeInLong' -> 'trade_time_in_long',
+    'high52Week' -> 'high_52_week'. Keys repeat across every contract of a chain, so results are cached.
+    """
+    return _WORD_BOUNDARY.sub('_', key).lower()
+
+class Model:
+    """ Keeps every field of a response object, so fields the API adds later are not dropped """
+
+    def __init__(self, **kwargs):
+        for key, value in kwargs.items():
+            setattr(self, snake_case(key), value)
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({", ".join(f"{k}={v!r}" for k, v in vars(self).items())})'
+
+    def to_dict(self) -> dict:
+        return dict(vars(self))
+
+class Extended(Model):
+    """ endpoint: /quotes, extended hours market data """
+
+class Fundamental(Model):
+    """ endpoint: /quotes """
+
+class Quote(Model):
+    """ endpoint: /quotes """
+
+class Reference(Model):
+    """ endpoint: /quotes """
+
+class Regular(Model):
+    """ endpoint: /quotes, regular market session """
+
+class Equity(Model):
+    """ endpoint: /quotes, one symbol with its extended, fundamental, quote, reference and regular sub-objects """
+
+class ExpirationDate(Model):
+    """ endpoint: /expirationchain """
+
+class Contract(Model):
+    """ endpoint: /chains, one option contract """
+
+    def to_dict(self) -> dict:
+        """ Flat row of the contract; the nested deliverables list is summarized by deliverable_note """
+        return { k: v for k, v in vars(self).items() if k != 'option_deliverables_list' }
+
+class Options:
+    """ endpoint: /chains, call and put contracts grouped by expiration date """
+
+    def __init__(self, calls: dict[datetime, list[Contract]] | None = None, puts: dict[datetime, list[Contract]] | None = None):
+        self.calls = calls if calls is not None else defaultdict(list)
+        self.puts = puts if puts is not None else defaultdict(list)
+
+    def __len__(self) -> int:
+        return sum(len(contracts) for contracts in self.calls.values()) + sum(len(contracts) for contracts in self.puts.values())
+
+    def to_dictl(self) -> list[dict]:
+        """ Every contract as a flat dict, puts first """
+        return [
+            contract.to_dict()
+            for date_map in (self.puts, self.calls)
+            for contracts in date_map.values()
+            for contract in contracts
+        ]
+
+__all__ = [
+    'Contract', 'Equity', 'ExpirationDate', 'Extended', 'Fundamental', 'Model', 'Options', 'Quote',
+    'Reference', 'Regular', 'snake_case'
+]
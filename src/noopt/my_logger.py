@@ -4,6 +4,8 @@ import logging
 import logging.config
 from typing import override
 
+import json_backend
+
 
 LOG_RECORD_BUILTIN_ATTRS = {
     'args',
@@ -43,7 +45,7 @@ class JSONFormatter(logging.Formatter):
     @override
     def format(self, record: logging.LogRecord) -> str:
         message = self._prepare_log_dict(record)
-        return json.dumps(message, default=str)
+        return json_backend.dumps(message, default=str)
 
     def _prepare_log_dict(self, record: logging.LogRecord):
         always_fields = {
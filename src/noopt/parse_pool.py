@@ -0,0 +1,96 @@
+""" Opt-in process pool for parsing large chain responses """
+
+from config import config
+from models import Options
+from my_logger import logger
+import parser
+
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+import threading
+
+
+_lock = threading.Lock()
+_pool: ProcessPoolExecutor | None = None
+_pool_size: int = 0
+
+def get_pool() -> ProcessPoolExecutor:
+    """ Returns the process-wide parse pool, rebuilt whenever config.parse_processes changes """
+    global _pool, _pool_size
+
+    processes = config.parse_processes
+    with _lock:
+        if _pool is None or _pool_size != processes:
+            if _pool is not None:
+                logger.info('Parse pool configuration changed, rebuilding process pool')
+                _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = ProcessPoolExecutor(max_workers=processes)
+            _pool_size = processes
+    return _pool
+
+def close_pool() -> None:
+    """ Shuts down the parse pool's worker processes """
+    global _pool, _pool_size
+
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
+        _pool_size = 0
+
+def _in_process(size: int) -> bool:
+    return config.parse_processes <= 0 or size < config.parse_threshold
+
+def _split(items: list[tuple], weights: list[int], parts: int) -> list[list[tuple]]:
+    """ Splits {items} into at most {parts} contiguous groups of roughly equal total weight """
+    target = sum(weights) / parts
+    groups, group, weight = [], [], 0
+    for item, item_weight in zip(items, weights):
+        group.append(item)
+        weight += item_weight
+        if weight >= target and len(groups) < parts - 1:
+            groups.append(group)
+            group, weight = [], 0
+    if group:
+        groups.append(group)
+    return groups
+
+def parse_chains(response: dict) -> Options:
+    """
+    endpoint: /chains
+
+    parser.parse_chains, split by expiration across the parse pool for large responses
+    """
+    expirations = {
+        expr_date_str: 0
+        for key in ('callExpDateMap', 'putExpDateMap')
+        for expr_date_str in response[key]
+    }
+    for key in ('callExpDateMap', 'putExpDateMap'):
+        for expr_date_str, contracts in response[key].items():
+            expirations[expr_date_str] += sum(len(data) for data in contracts.values())
+
+    if _in_process(sum(expirations.values())):
+        return parser.parse_chains(response)
+
+    groups = _split(list(expirations.items()), list(expirations.values()), config.parse_processes)
+    logger.info(f'Parsing {sum(expirations.values())} contracts across {len(groups)} processes')
+
+    def part(group: list[tuple]) -> dict:
+        return {
+            **{ k: v for k, v in response.items() if k not in ('callExpDateMap', 'putExpDateMap') },
+            **{
+                key: { expr_date_str: response[key][expr_date_str] for expr_date_str, _ in group if expr_date_str in response[key] }
+                for key in ('callExpDateMap', 'putExpDateMap')
+            }
+        }
+
+    calls, puts = defaultdict(list), defaultdict(list)
+    for options in get_pool().map(parser.parse_chains, map(part, groups)):
+        for date, contracts in options.calls.items():
+            calls[date].extend(contracts)
+        for date, contracts in options.puts.items():
+            puts[date].extend(contracts)
+    return Options(calls=calls, puts=puts)
+
+__all__ = ['close_pool', 'get_pool', 'parse_chains']
@@ -1,8 +1,19 @@
+from chain_arrays import OptionChainArrays
+from chain_index import ChainIndex
+from data_enums import ExerciseType, ExpirationType, SettlementType
+from data_schemas import OptionChain
+import json_backend
 from my_logger import logger
 from models import *
+from stream_parser import ChainStreamParser
+from validation import decode
 
 from collections import defaultdict
-import json
+from datetime import datetime
+from functools import lru_cache
+from typing import Iterable, Iterator
+
+import polars as pl
 
 
 def parse_kwargs(params):
@@ -17,9 +28,76 @@ def parse_kwargs(params):
 
     return result
 
+class _LazySubObject:
+    """
+    Descriptor that keeps the raw dict assigned to it and builds {factory}(**raw) on first access, so
+    sub-objects that are never read are never decoded
+    """
+
+    def __init__(self, factory):
+        self.factory = factory
+
+    def __set_name__(self, owner, name):
+        self.slot = f'_raw_{name}'
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+
+        value = obj.__dict__.get(self.slot, {})
+        if isinstance(value, dict):
+            value = obj.__dict__[self.slot] = self.factory(**value)
+        return value
+
+    def __set__(self, obj, value):
+        obj.__dict__[self.slot] = value
+
+class LazyEquity(Equity):
+    """ Equity whose sub-objects are decoded from the retained response on first attribute access """
+    extended = _LazySubObject(Extended)
+    fundamental = _LazySubObject(Fundamental)
+    quote = _LazySubObject(Quote)
+    reference = _LazySubObject(Reference)
+    regular = _LazySubObject(Regular)
+
+@lru_cache(maxsize=1024)
+def expiration_date(expr_date_str: str) -> datetime:
+    """ Parses an expiration key, e.g. '2025-05-30:0'. Keys repeat across chains, so results are cached. """
+    return datetime.strptime(expr_date_str.partition(':')[0], "%Y-%m-%d")
+
+def categorize_chain(df: pl.DataFrame) -> pl.DataFrame:
+    """ Casts the low-cardinality string columns of a chain frame (e.g. read from chains_df.csv) to CHAIN_CATEGORIES """
+    return df.with_columns(
+        pl.col(name).cast(dtype)
+        for name, dtype in CHAIN_CATEGORIES.items()
+        if df.schema.get(name) == pl.String
+    )
+
+def decode_chain_times(df: pl.DataFrame) -> pl.DataFrame:
+    """
+    Decodes the temporal columns of a chain frame in bulk, column-wise:
+        trade_time_in_long, quote_time_in_long, last_trading_day -- epoch milliseconds -> Datetime(ms, UTC)
+        expiration_date -- ISO 8601 string -> Datetime(ms, UTC); repeated strings are parsed once
+    Columns that are missing or already decoded are left as-is.
+    """
+    exprs = []
+    for name in ('trade_time_in_long', 'quote_time_in_long', 'last_trading_day'):
+        if df.schema.get(name) in (pl.Int64, pl.Int32):
+            exprs.append(pl.col(name).cast(pl.Datetime('ms', 'UTC')))
+    if df.schema.get('expiration_date') == pl.String:
+        exprs.append(
+            pl.col('expiration_date').str.to_datetime(
+                '%Y-%m-%dT%H:%M:%S%.f%:z', time_unit='ms', time_zone='UTC', cache=True
+            )
+        )
+
+    return df.with_columns(exprs) if exprs else df
+
 def parse_quotes(response) -> list[Equity]:
     """
     endpoint: /quotes
+
+    Sub-objects (extended, fundamental, quote, reference, regular) are decoded lazily, see LazyEquity
     """
     logger.info('Parsing quotes')
 
@@ -28,12 +106,12 @@ def parse_quotes(response) -> list[Equity]:
         if value.get('assetMainType', '') != 'EQUITY':
             continue
 
-        equity = Equity(**value)
-        equity.extended = Extended(**value.get('extended', {}))
-        equity.fundamental = Fundamental(**value.get('fundamental', {}))
-        equity.quote = Quote(**value.get('quote', {}))
-        equity.reference = Reference(**value.get('reference', {}))
-        equity.regular = Regular(**value.get('regular', {}))
+        equity = LazyEquity(**value)
+        equity.extended = value.get('extended', {})
+        equity.fundamental = value.get('fundamental', {})
+        equity.quote = value.get('quote', {})
+        equity.reference = value.get('reference', {})
+        equity.regular = value.get('regular', {})
         equities.append(equity)
 
     return equities
@@ -54,18 +132,17 @@ def parse_chains(response) -> Options:
     """
     endpoint: /chains
     
-    Gets pair of call and put contracts
+    Gets pair of call and put contracts. Every contract listed at a strike is kept, including
+    adjusted/non-standard contracts and alternate roots (see parse_chains_index to look them up).
     """
     logger.info('Parsing chains')
 
     def date_map(key):
-        date_format = "%Y-%m-%d"
-        
         result = defaultdict(list)
         for expr_date_str, contracts in response[key].items():
-            date = datetime.strptime(expr_date_str.partition(':')[0], date_format)
+            date = expiration_date(expr_date_str)
             for _, data in contracts.items():
-                result[date].append(Contract(**data[0]))
+                result[date].extend(Contract(**contract) for contract in data)
         return result
 
     calls = date_map('callExpDateMap')
@@ -74,17 +151,175 @@ def parse_chains(response) -> Options:
 
     return result
 
+# low-cardinality chain columns: Enum where data_enums defines the full vocabulary, Categorical otherwise.
+# parse_chains_frame and categorize_chain both raise polars.exceptions.InvalidOperationError on a value
+# outside an Enum's vocabulary.
+PUT_CALL = pl.Enum(['CALL', 'PUT'])  # data_enums.PutCall
+EXPIRATION_TYPE = pl.Enum([ member.name for member in ExpirationType ])
+SETTLEMENT_TYPE = pl.Enum([ member.name for member in SettlementType ])
+EXERCISE_TYPE = pl.Enum([ member.name for member in ExerciseType ])
+
+CHAIN_CATEGORIES = {
+    'underlying_symbol': pl.Categorical,
+    'put_call': PUT_CALL,
+    'exchange_name': pl.Categorical,
+    'expiration_type': EXPIRATION_TYPE,
+    'settlement_type': SETTLEMENT_TYPE,
+    'deliverable_note': pl.Categorical,
+    'option_root': pl.Categorical,
+    'exercise_type': EXERCISE_TYPE,
+}
+
+# (response key, column, dtype) of every contract field kept by parse_chains_frame
+CHAIN_COLUMNS = [
+    ('putCall', 'put_call', CHAIN_CATEGORIES['put_call']),
+    ('symbol', 'symbol', pl.String),
+    ('description', 'description', pl.String),
+    ('exchangeName', 'exchange_name', CHAIN_CATEGORIES['exchange_name']),
+    ('bid', 'bid', pl.Float64),
+    ('ask', 'ask', pl.Float64),
+    ('last', 'last', pl.Float64),
+    ('mark', 'mark', pl.Float64),
+    ('bidSize', 'bid_size', pl.Int64),
+    ('askSize', 'ask_size', pl.Int64),
+    ('bidAskSize', 'bid_ask_size', pl.String),
+    ('lastSize', 'last_size', pl.Int64),
+    ('highPrice', 'high_price', pl.Float64),
+    ('lowPrice', 'low_price', pl.Float64),
+    ('openPrice', 'open_price', pl.Float64),
+    ('closePrice', 'close_price', pl.Float64),
+    ('totalVolume', 'total_volume', pl.Int64),
+    ('tradeTimeInLong', 'trade_time_in_long', pl.Int64),
+    ('quoteTimeInLong', 'quote_time_in_long', pl.Int64),
+    ('netChange', 'net_change', pl.Float64),
+    ('volatility', 'volatility', pl.Float64),
+    ('delta', 'delta', pl.Float64),
+    ('gamma', 'gamma', pl.Float64),
+    ('theta', 'theta', pl.Float64),
+    ('vega', 'vega', pl.Float64),
+    ('rho', 'rho', pl.Float64),
+    ('openInterest', 'open_interest', pl.Int64),
+    ('timeValue', 'time_value', pl.Float64),
+    ('theoreticalOptionValue', 'theoretical_option_value', pl.Float64),
+    ('theoreticalVolatility', 'theoretical_volatility', pl.Float64),
+    ('strikePrice', 'strike_price', pl.Float64),
+    ('expirationDate', 'expiration_date', pl.String),
+    ('daysToExpiration', 'days_to_expiration', pl.Int64),
+    ('expirationType', 'expiration_type', CHAIN_CATEGORIES['expiration_type']),
+    ('lastTradingDay', 'last_trading_day', pl.Int64),
+    ('multiplier', 'multiplier', pl.Float64),
+    ('settlementType', 'settlement_type', CHAIN_CATEGORIES['settlement_type']),
+    ('deliverableNote', 'deliverable_note', CHAIN_CATEGORIES['deliverable_note']),
+    ('percentChange', 'percent_change', pl.Float64),
+    ('markChange', 'mark_change', pl.Float64),
+    ('markPercentChange', 'mark_percent_change', pl.Float64),
+    ('intrinsicValue', 'intrinsic_value', pl.Float64),
+    ('extrinsicValue', 'extrinsic_value', pl.Float64),
+    ('optionRoot', 'option_root', CHAIN_CATEGORIES['option_root']),
+    ('exerciseType', 'exercise_type', CHAIN_CATEGORIES['exercise_type']),
+    ('high52Week', 'high_52_week', pl.Float64),
+    ('low52Week', 'low_52_week', pl.Float64),
+    ('pennyPilot', 'penny_pilot', pl.Boolean),
+    ('nonStandard', 'non_standard', pl.Boolean),
+    ('inTheMoney', 'in_the_money', pl.Boolean),
+    ('mini', 'mini', pl.Boolean),
+]
+
+def parse_chains_frame(response) -> pl.DataFrame:
+    """
+    endpoint: /chains
+
+    Columnar parse_chains: contract fields are appended straight into per-column buffers and returned
+    as a typed DataFrame (see CHAIN_COLUMNS), ready for analysis.add_columns, without building a
+    Contract or dict per contract. Temporal columns are decoded by decode_chain_times. The chain's
+    symbol is repeated as underlying_symbol, since option roots (e.g. SPXW, adjusted roots) may differ.
+    """
+    logger.info('Parsing chains into frame')
+
+    keys = [ key for key, _, _ in CHAIN_COLUMNS ]
+    buffers = [ [] for _ in keys ]
+    columns = list(zip(keys, buffers))
+
+    # puts first, matching Options.to_dictl
+    for key in ('putExpDateMap', 'callExpDateMap'):
+        for contracts in response[key].values():
+            for data in contracts.values():
+                for contract in data:
+                    get = contract.get
+                    for field, buffer in columns:
+                        buffer.append(get(field))
+
+    df = pl.DataFrame([
+        pl.Series('underlying_symbol', [ response.get('symbol') ] * len(buffers[0]), dtype=CHAIN_CATEGORIES['underlying_symbol']),
+        *(
+            # values outside an Enum's vocabulary raise, as in categorize_chain, instead of becoming null
+            pl.Series(name, buffer, dtype=dtype, strict=name in CHAIN_CATEGORIES)
+            for (_, name, dtype), buffer in zip(CHAIN_COLUMNS, buffers)
+        )
+    ])
+    return decode_chain_times(df)
+
+def parse_chains_arrays(response) -> OptionChainArrays:
+    """
+    endpoint: /chains
+
+    Compact NumPy-backed chain, intended for holding chains for a whole universe in memory
+    """
+    logger.info('Parsing chains into arrays')
+
+    return OptionChainArrays.from_response(response)
+
+def parse_chains_index(response) -> ChainIndex:
+    """
+    endpoint: /chains
+
+    Every contract of the chain keyed by (option root, expiration, strike, put/call), for looking up
+    or filtering on non-standard deliverables
+    """
+    logger.info('Indexing chains')
+
+    return ChainIndex.from_response(response)
+
+def parse_option_chain(response) -> OptionChain:
+    """
+    endpoint: /chains
+
+    Decodes the full response into the data_schemas.OptionChain schema, validated according to
+    config.validation
+    """
+    logger.info('Decoding option chain')
+
+    return decode(OptionChain, response)  # type: ignore
+
+def parse_chains_stream(chunks: Iterable[bytes], batch_size: int = 1000) -> Iterator[Options]:
+    """
+    endpoint: /chains
+
+    Incremental parse_chains for large (e.g. full SPX) chains. The raw response body is walked as it
+    arrives and each batch of roughly {batch_size} contracts is yielded as its own Options, so peak
+    memory is bounded by the batch size instead of the size of the chain.
+    """
+    logger.info('Parsing chains incrementally')
+
+    parser = ChainStreamParser(chunks)
+    for batch in parser.batches(batch_size):
+        calls, puts = defaultdict(list), defaultdict(list)
+        for key, expr_date_str, data in batch:
+            result = calls if key == 'callExpDateMap' else puts
+            result[expiration_date(expr_date_str)].extend(Contract(**contract) for contract in data)
+        yield Options(calls=calls, puts=puts)
+
 def main():
-    with open('./data/quotes.json', 'r') as f:
-        response = json.loads(f.read())
+    with open('./data/quotes.json', 'rb') as f:
+        response = json_backend.loads(f.read())
     parse_quotes(response)
 
-    with open('./data/chains.json', 'r') as f:
-        response = json.loads(f.read())
+    with open('./data/chains.json', 'rb') as f:
+        response = json_backend.loads(f.read())
     parse_chains(response)
 
-    with open('./data/expirationchain.json', 'r') as f:
-        response = json.loads(f.read())['expirationList']
+    with open('./data/expirationchain.json', 'rb') as f:
+        response = json_backend.loads(f.read())['expirationList']
     parse_expiration_chain(response)
 
 if __name__ == '__main__':
@@ -0,0 +1,229 @@
+""" Vectorized Black-Scholes prices, Greeks and implied volatility over whole chains """
+
+from my_logger import logger
+
+import math
+
+import numpy as np
+import polars as pl
+
+
+_MIN_T = 1e-4  # ~50 minutes, so contracts about to expire stay well defined
+_MIN_SIGMA, _MAX_SIGMA = 1e-4, 5.0
+
+try:
+    from scipy.special import ndtr as _ndtr
+
+    def norm_cdf(x: np.ndarray) -> np.ndarray:
+        return _ndtr(x)
+
+except ImportError:
+    def norm_cdf(x: np.ndarray) -> np.ndarray:
+        # Abramowitz & Stegun 7.1.26
+        z = np.abs(x) / math.sqrt(2)
+        t = 1 / (1 + 0.3275911 * z)
+        poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+        erf = 1 - poly * np.exp(-z * z)
+        return 0.5 * (1 + np.sign(x) * erf)
+
+def norm_pdf(x: np.ndarray) -> np.ndarray:
+    return np.exp(-0.5 * x * x) / math.sqrt(2 * math.pi)
+
+def _d1_d2(S, K, T, r, sigma, q) -> tuple[np.ndarray, np.ndarray]:
+    T = np.maximum(T, _MIN_T)
+    vol_t = sigma * np.sqrt(T)
+    d1 = (np.log(S / K) + (r - q + 0.5 * sigma * sigma) * T) / vol_t
+    return d1, d1 - vol_t
+
+def _expired(T) -> np.ndarray:
+    return np.asarray(T) <= 0
+
+def price(S, K, T, r, sigma, is_call, q=0.0) -> np.ndarray:
+    """ Black-Scholes price per share, intrinsic value at expiration """
+    expired = _expired(T)
+    d1, d2 = _d1_d2(S, K, T, r, sigma, q)
+    T = np.maximum(T, _MIN_T)
+    S_q, K_r = S * np.exp(-q * T), K * np.exp(-r * T)
+
+    call = np.where(expired, np.maximum(S - K, 0), S_q * norm_cdf(d1) - K_r * norm_cdf(d2))
+    put = np.where(expired, np.maximum(K - S, 0), K_r * norm_cdf(-d2) - S_q * norm_cdf(-d1))
+    return np.where(is_call, call, put)
+
+def greeks(S, K, T, r, sigma, is_call, q=0.0) -> dict[str, np.ndarray]:
+    """ delta, gamma, theta (per year), vega and rho (per unit of volatility/rate), at expiration for T <= 0 """
+    expired = _expired(T)
+    d1, d2 = _d1_d2(S, K, T, r, sigma, q)
+    T = np.maximum(T, _MIN_T)
+    sqrt_t = np.sqrt(T)
+    S_q, K_r = S * np.exp(-q * T), K * np.exp(-r * T)
+    pdf_d1 = norm_pdf(d1)
+
+    decay = -S_q * pdf_d1 * sigma / (2 * sqrt_t)
+    call_theta = decay - r * K_r * norm_cdf(d2) + q * S_q * norm_cdf(d1)
+    put_theta = decay + r * K_r * norm_cdf(-d2) - q * S_q * norm_cdf(-d1)
+
+    delta = np.where(is_call, np.exp(-q * T) * norm_cdf(d1), -np.exp(-q * T) * norm_cdf(-d1))
+    expired_delta = np.where(is_call, np.where(S > K, 1.0, 0.0), np.where(S < K, -1.0, 0.0))
+
+    return {
+        'delta': np.where(expired, expired_delta, delta),
+        'gamma': np.where(expired, 0.0, np.exp(-q * T) * pdf_d1 / (S * sigma * sqrt_t)),
+        'theta': np.where(expired, 0.0, np.where(is_call, call_theta, put_theta)),
+        'vega': np.where(expired, 0.0, S_q * pdf_d1 * sqrt_t),
+        'rho': np.where(expired, 0.0, np.where(is_call, K_r * T * norm_cdf(d2), -K_r * T * norm_cdf(-d2))),
+    }
+
+def implied_volatility(target, S, K, T, r, is_call, q=0.0, tol: float = 1e-6, max_iter: int = 100) -> np.ndarray:
+    """
+    Implied volatility of every option priced at {target}, solved for the whole batch at once.
+
+    Each element runs a safeguarded Newton iteration: the root is kept bracketed in [lo, hi] (price is
+    increasing in sigma), and a bisection step is taken whenever the Newton step would leave the bracket
+    or vega vanishes, so convergence is guaranteed. Prices outside the no-arbitrage bounds, expired
+    (T <= 0) contracts and elements that fail to converge within {max_iter} iterations are NaN. Where
+    vega is negligible (e.g. deep ITM or far OTM contracts close to expiration) many volatilities match
+    {target} within {tol}, and the one returned is not meaningful.
+
+    Keyword Arguments:
+        tol : float -- absolute price tolerance
+        max_iter : int -- maximum number of iterations
+    """
+    target, S, K, T, r, q = np.broadcast_arrays(*(np.asarray(a, dtype=np.float64) for a in (target, S, K, T, r, q)))
+    is_call = np.broadcast_to(np.asarray(is_call, dtype=bool), target.shape)
+    T_ = np.maximum(T, _MIN_T)
+    S_q, K_r = S * np.exp(-q * T_), K * np.exp(-r * T_)
+
+    lower = np.where(is_call, np.maximum(S_q - K_r, 0), np.maximum(K_r - S_q, 0))
+    upper = np.where(is_call, S_q, K_r)
+    valid = np.isfinite(target) & (target > lower) & (target < upper) & ~_expired(T)
+
+    lo = np.full(target.shape, _MIN_SIGMA)
+    hi = np.full(target.shape, _MAX_SIGMA)
+    # Brenner-Subrahmanyam approximation as the initial guess
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sigma = np.clip(np.sqrt(2 * math.pi / T_) * target / S, 0.05, 1.0)
+    sigma = np.where(np.isfinite(sigma), sigma, 0.3)
+
+    active = valid.copy()
+    converged = np.zeros(target.shape, dtype=bool)
+    for _ in range(max_iter):
+        if not active.any():
+            break
+
+        diff = price(S, K, T, r, sigma, is_call, q) - target
+        done = active & (np.abs(diff) < tol)
+        converged |= done
+        active &= ~done
+
+        lo = np.where(active & (diff < 0), sigma, lo)
+        hi = np.where(active & (diff > 0), sigma, hi)
+        vega = greeks(S, K, T, r, sigma, is_call, q)['vega']
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            step = sigma - diff / vega
+        bisect = ~((vega > 1e-10) & (step > lo) & (step < hi))
+        sigma = np.where(active, np.where(bisect, 0.5 * (lo + hi), step), sigma)
+
+    if active.any():
+        logger.debug(f'Implied volatility did not converge for {int(active.sum())} contracts')
+    return np.where(converged, sigma, np.nan)
+
+def _values(df: pl.DataFrame, value: float | pl.Expr) -> np.ndarray:
+    if isinstance(value, pl.Expr):
+        return df.select(value.cast(pl.Float64)).to_series().to_numpy()
+    return np.full(df.height, value, dtype=np.float64)
+
+def _invalid(column: pl.Expr) -> pl.Expr:
+    """ Schwab reports missing Greeks on illiquid strikes as -999 (or NaN) """
+    return column.is_null() | column.is_nan() | (column <= -999)
+
+BS_COLUMNS = {
+    'bs_price': 'theoretical_option_value',
+    'bs_volatility': 'volatility',
+    'bs_delta': 'delta',
+    'bs_gamma': 'gamma',
+    'bs_theta': 'theta',
+    'bs_vega': 'vega',
+    'bs_rho': 'rho',
+}
+
+def price_chain(
+        df: pl.DataFrame,
+        underlying_price: float | pl.Expr,
+        interest_rate: float | pl.Expr,
+        volatility: float | pl.Expr | None = None,
+        days_to_expiration: float | pl.Expr | None = None,
+        dividend_yield: float | pl.Expr = 0.0,
+        how: str = 'add'
+    ) -> pl.DataFrame:
+    """
+    Prices every contract of a chain frame (e.g. parser.parse_chains_frame) locally, in Schwab's units.
+    Replaces the ANALYTICAL what-if inputs of data_api.chains(...) without another request.
+
+    The implied volatility of each contract is solved from its mark (bs_implied_volatility, always added).
+    Prices and Greeks are evaluated at {volatility} when given, otherwise at the implied volatility,
+    falling back to Schwab's volatility where the mark has no implied volatility.
+
+    Arguments:
+        df -- chain frame with put_call, strike_price, mark, days_to_expiration and volatility columns
+        underlying_price -- price of the underlying, or an expression per row (e.g. pl.col('underlying_ask'))
+        interest_rate -- risk-free rate in percent, e.g. the chain's interestRate
+
+    Keyword Arguments:
+        volatility : float -- what-if volatility in percent
+        days_to_expiration : float -- what-if days to expiration
+        dividend_yield : float -- continuous dividend yield in percent
+        how : str -- what to do with the results (see BS_COLUMNS)
+            add -- add them as bs_* columns
+            fill -- replace only missing/-999 Schwab values
+            replace -- replace the Schwab columns, e.g. for what-if analysis with analysis.add_columns
+    """
+    if how not in ('add', 'fill', 'replace'):
+        raise ValueError(f'Unsupported how={how}')
+
+    logger.info('Pricing options chain')
+
+    S = _values(df, underlying_price)
+    K = df['strike_price'].cast(pl.Float64).to_numpy()
+    days = _values(df, pl.col('days_to_expiration') if days_to_expiration is None else days_to_expiration)
+    T = days / 365
+    r = _values(df, interest_rate) / 100
+    q = _values(df, dividend_yield) / 100
+    is_call = (df['put_call'].cast(pl.String) == 'CALL').to_numpy()
+
+    iv = implied_volatility(df['mark'].cast(pl.Float64).to_numpy(), S, K, T, r, is_call, q)
+    if volatility is None:
+        schwab = df.select(
+            pl.when(_invalid(pl.col('volatility'))).then(None).otherwise(pl.col('volatility') / 100).cast(pl.Float64)
+        ).to_series().to_numpy()
+        sigma = np.where(np.isfinite(iv), iv, schwab)
+    else:
+        sigma = _values(df, volatility) / 100
+    sigma = np.clip(sigma, _MIN_SIGMA, _MAX_SIGMA)
+
+    g = greeks(S, K, T, r, sigma, is_call, q)
+    columns = {
+        'bs_price': price(S, K, T, r, sigma, is_call, q),
+        'bs_volatility': sigma * 100,
+        'bs_implied_volatility': iv * 100,
+        'bs_delta': g['delta'],
+        'bs_gamma': g['gamma'],
+        'bs_theta': g['theta'] / 365,
+        'bs_vega': g['vega'] / 100,
+        'bs_rho': g['rho'] / 100,
+    }
+    out = df.with_columns(pl.Series(name, values, dtype=pl.Float64, nan_to_null=True) for name, values in columns.items())
+
+    if how == 'add':
+        return out
+    if how == 'fill':
+        out = out.with_columns(
+            pl.when(_invalid(pl.col(schwab))).then(pl.col(bs)).otherwise(pl.col(schwab)).alias(schwab)
+            for bs, schwab in BS_COLUMNS.items()
+        )
+    else:
+        out = out.with_columns(pl.col(bs).alias(schwab) for bs, schwab in BS_COLUMNS.items())
+        if days_to_expiration is not None:
+            out = out.with_columns(pl.Series('days_to_expiration', days).cast(df.schema['days_to_expiration']))
+    return out.drop(BS_COLUMNS)
+
+__all__ = ['BS_COLUMNS', 'greeks', 'implied_volatility', 'norm_cdf', 'norm_pdf', 'price', 'price_chain']
@@ -0,0 +1,118 @@
+""" Streaming top-K screener over the chains of many underlyings """
+
+from analysis import add_columns_lazy
+from data_api import chains_frame_many, quotes
+from my_logger import logger
+from strategies import STRATEGIES
+
+from typing import Iterable
+
+import polars as pl
+
+
+COVERED = 'covered'
+
+class Screener:
+    """
+    Bounded top-K per strategy over a stream of chain frames
+
+    Arguments:
+        k -- number of candidates kept per strategy
+    """
+
+    def __init__(self, k: int = 10):
+        self.k = k
+        self.seen = 0
+        self._rankings: dict[str, tuple] = {}
+        self._best: dict[str, pl.DataFrame] = {}
+
+    def rank(self, strategy: str, metric: str, *predicates: pl.Expr, descending: bool = True, **bounds) -> 'Screener':
+        """
+        Screens {strategy} candidates, keeping the top k by {metric}
+
+        Arguments:
+            strategy -- 'covered' or a key of strategies.STRATEGIES
+            metric -- column to rank by, e.g. c_annualized_return_if_unchanged, m_return_if_exercised,
+                      annualized_return_on_risk
+            predicates -- candidates must satisfy all of them
+
+        Keyword Arguments:
+            descending : bool -- keep the largest values of {metric}, the smallest if False
+            ... -- forwarded to the strategy, e.g. commission for covered or max_width for vertical
+        """
+        if strategy != COVERED and strategy not in STRATEGIES:
+            raise ValueError(f'Unknown strategy {strategy}')
+
+        self._rankings[strategy] = (metric, predicates, descending, bounds)
+        self._best.pop(strategy, None)
+        return self
+
+    def _candidates(self, strategy: str, chains: pl.DataFrame, underlying_ask: float | None) -> pl.DataFrame:
+        metric, predicates, descending, bounds = self._rankings[strategy]
+
+        if strategy == COVERED:
+            lf = chains.lazy()
+            if 'non_standard' in chains.columns:
+                lf = lf.filter(~pl.col('non_standard').cast(pl.Boolean).fill_null(False))
+            predicate = pl.all_horizontal(pl.col('put_call').cast(pl.String) == 'CALL', *predicates)
+            lf = add_columns_lazy(lf, underlying_ask, predicate=predicate, **bounds)
+        else:
+            lf = STRATEGIES[strategy](chains, **bounds).lazy()
+            if predicates:
+                lf = lf.filter(*predicates)
+
+        return lf.filter(pl.col(metric).is_finite()).top_k(self.k, by=metric, reverse=not descending).collect()
+
+    def add(self, chains: pl.DataFrame, underlying_ask: float | None = None) -> None:
+        """
+        Scores the chain of one (or a few) underlyings and merges it into the running top k
+
+        Arguments:
+            chains -- chain frame, e.g. data_api.chains_frame(...)
+            underlying_ask -- ask price of the underlying, covered calls are skipped without it
+        """
+        for strategy, (metric, _, descending, _) in self._rankings.items():
+            if strategy == COVERED and underlying_ask is None:
+                logger.info('Underlying ask not provided, skipping covered calls')
+                continue
+            candidates = self._candidates(strategy, chains, underlying_ask)
+            if strategy in self._best:
+                candidates = pl.concat([ self._best[strategy], candidates ], how='vertical_relaxed')
+            self._best[strategy] = candidates.top_k(self.k, by=metric, reverse=not descending)
+        self.seen += 1
+
+    def consume(self, chains: Iterable[tuple[pl.DataFrame, float | None]]) -> 'Screener':
+        """ add(...)s every (chain frame, underlying ask) as it arrives """
+        for frame, underlying_ask in chains:
+            self.add(frame, underlying_ask)
+        return self
+
+    def top(self, strategy: str) -> pl.DataFrame:
+        """ Best candidates of {strategy} so far, best first """
+        metric, _, descending, _ = self._rankings[strategy]
+        best = self._best.get(strategy)
+        if best is None:
+            return pl.DataFrame()
+        return best.sort(metric, descending=descending)
+
+def screen_symbols(screener: Screener, symbols: list[str], **kwargs) -> Screener:
+    """
+    Screens the chains of {symbols}, scoring each as soon as it is fetched (see data_api.chains_frame_many).
+    Symbols whose chain fails to fetch are skipped, as are covered calls of symbols without an ask (e.g. indices).
+
+    Keyword Arguments:
+        ... -- forwarded to data_api.chains_frame_many
+    """
+    asks = { equity.symbol: getattr(equity.quote, 'ask_price', None) for equity in quotes(symbols, fields='quote') }  # type: ignore
+
+    logger.info(f'Screening {len(symbols)} symbols')
+    for symbol, frame in chains_frame_many(symbols, return_exceptions=True, **kwargs):
+        if isinstance(frame, Exception):
+            logger.info(f'Skipping {symbol}, chain failed: {frame!r}')
+            continue
+        if asks.get(symbol) is None:
+            logger.info(f'No ask for {symbol}')
+        screener.add(frame, asks.get(symbol))
+    return screener
+
+__all__ = ['COVERED', 'Screener', 'screen_symbols']
@@ -0,0 +1,252 @@
+""" Vectorized multi-leg strategy enumeration over chain frames """
+
+from my_logger import logger
+
+import polars as pl
+
+
+_KEYS = ('option_root', 'expiration_date', 'put_call')
+
+def _legs(chains: pl.DataFrame | pl.LazyFrame) -> pl.LazyFrame:
+    """ Standard contracts of {chains} with the columns needed to build strategies """
+    lf = chains.lazy()
+    if 'non_standard' in lf.collect_schema().names():
+        lf = lf.filter(~pl.col('non_standard').cast(pl.Boolean).fill_null(False))
+
+    return lf.select(
+        pl.col('option_root').cast(pl.String),
+        'expiration_date',
+        'days_to_expiration',
+        pl.col('put_call').cast(pl.String),
+        'symbol',
+        strike=pl.col('strike_price').cast(pl.Float64),
+        strike_key=(pl.col('strike_price') * 1000).round().cast(pl.Int64),
+        bid='bid',
+        ask='ask',
+        delta='delta',
+        multiplier='multiplier',
+    )
+
+def _short(legs: pl.LazyFrame, min_delta: float, max_delta: float) -> pl.LazyFrame:
+    """ Legs that can be sold: bid and |delta| within bounds (Schwab's -999 placeholders never are) """
+    return legs.filter(pl.col('bid') > 0, pl.col('delta').abs().is_between(min_delta, max_delta))
+
+def _long(legs: pl.LazyFrame) -> pl.LazyFrame:
+    return legs.filter(pl.col('ask') > 0)
+
+def _prefixed(lf: pl.LazyFrame, prefix: str) -> pl.LazyFrame:
+    return lf.select(pl.all().name.prefix(prefix))
+
+def _same_series(left: str, right: str, keys=_KEYS) -> list[pl.Expr]:
+    return [ pl.col(f'{left}{key}') == pl.col(f'{right}{key}') for key in keys ]
+
+def _returns(lf: pl.LazyFrame) -> pl.LazyFrame:
+    """ Drops candidates that cannot make money (or cannot lose it, i.e. crossed quotes) and adds returns """
+    return lf.filter(pl.col('max_profit') > 0, pl.col('max_loss') > 0).with_columns(
+        return_on_risk=pl.col('max_profit') / pl.col('max_loss'),
+    ).with_columns(
+        annualized_return_on_risk=365 * pl.col('return_on_risk') / pl.col('days_to_expiration').clip(lower_bound=1),
+    )
+
+def _verticals(legs: pl.LazyFrame, max_width: float, min_credit: float, min_delta: float, max_delta: float) -> pl.LazyFrame:
+    short = _prefixed(
+        _short(legs, min_delta, max_delta).with_columns(
+            lower=pl.col('strike') - max_width,
+            upper=pl.col('strike') + max_width,
+        ),
+        'short_'
+    )
+    long = _prefixed(_long(legs), 'long_')
+
+    lf = short.join_where(
+        long,
+        *_same_series('short_', 'long_'),
+        pl.col('long_strike') >= pl.col('short_lower'),
+        pl.col('long_strike') <= pl.col('short_upper'),
+        pl.col('long_strike') != pl.col('short_strike'),
+    ).with_columns(
+        net_credit=pl.col('short_bid') - pl.col('long_ask'),
+        width=(pl.col('short_strike') - pl.col('long_strike')).abs(),
+    ).filter(
+        pl.col('net_credit') >= min_credit
+    )
+
+    # the long leg is the more valuable one for bull calls and bear puts (debit spreads)
+    is_call = pl.col('short_put_call') == 'CALL'
+    debit_spread = pl.when(is_call).then(pl.col('long_strike') < pl.col('short_strike')) \
+                                   .otherwise(pl.col('long_strike') > pl.col('short_strike'))
+    payoff_max = pl.when(debit_spread).then(pl.col('width')).otherwise(0.0)
+    payoff_min = pl.when(debit_spread).then(0.0).otherwise(-pl.col('width'))
+    lower_strike = pl.min_horizontal('short_strike', 'long_strike')
+    upper_strike = pl.max_horizontal('short_strike', 'long_strike')
+
+    lf = lf.select(
+        pl.lit('vertical').alias('strategy'),
+        option_root='short_option_root',
+        expiration_date='short_expiration_date',
+        days_to_expiration='short_days_to_expiration',
+        put_call='short_put_call',
+        short_symbol='short_symbol',
+        long_symbol='long_symbol',
+        short_strike='short_strike',
+        long_strike='long_strike',
+        width='width',
+        multiplier='short_multiplier',
+        net_credit='net_credit',
+        max_profit=(pl.col('net_credit') + payoff_max) * pl.col('short_multiplier'),
+        max_loss=-(pl.col('net_credit') + payoff_min) * pl.col('short_multiplier'),
+        breakeven=pl.when(is_call).then(lower_strike + pl.col('net_credit').abs()) \
+                                  .otherwise(upper_strike - pl.col('net_credit').abs()),
+        net_delta=pl.col('long_delta') - pl.col('short_delta'),
+    )
+    return _returns(lf)
+
+def verticals(
+        chains : pl.DataFrame | pl.LazyFrame,
+        max_width : float = 10.0,
+        min_credit : float = 0.0,
+        min_delta : float = 0.0,
+        max_delta : float = 1.0
+    ) -> pl.DataFrame:
+    """
+    Vertical spreads: one short and one long contract of the same type and expiration
+
+    Keyword Arguments:
+        max_width : float -- maximum distance between the strikes
+        min_credit : float -- minimum net credit per share, negative to include debit spreads
+        min_delta : float -- minimum |delta| of the short leg
+        max_delta : float -- maximum |delta| of the short leg
+    """
+    logger.info('Enumerating verticals')
+
+    return _verticals(_legs(chains), max_width, min_credit, min_delta, max_delta).collect()
+
+def iron_condors(
+        chains : pl.DataFrame | pl.LazyFrame,
+        max_width : float = 10.0,
+        min_credit : float = 0.0,
+        min_delta : float = 0.0,
+        max_delta : float = 1.0
+    ) -> pl.DataFrame:
+    """
+    Iron condors: a bull put credit spread below a bear call credit spread of the same expiration
+
+    Keyword Arguments:
+        max_width : float -- maximum width of either spread
+        min_credit : float -- minimum total net credit per share
+        min_delta : float -- minimum |delta| of the short legs
+        max_delta : float -- maximum |delta| of the short legs
+    """
+    logger.info('Enumerating iron condors')
+
+    # credit spreads only, each must bring in at least part of the credit
+    spreads = _verticals(_legs(chains), max_width, 0.0, min_delta, max_delta).filter(pl.col('net_credit') > 0)
+    puts = _prefixed(spreads.filter(pl.col('put_call') == 'PUT'), 'put_')
+    calls = _prefixed(spreads.filter(pl.col('put_call') == 'CALL'), 'call_')
+
+    lf = puts.join_where(
+        calls,
+        *_same_series('put_', 'call_', ('option_root', 'expiration_date')),
+        pl.col('put_short_strike') < pl.col('call_short_strike'),
+    ).with_columns(
+        net_credit=pl.col('put_net_credit') + pl.col('call_net_credit'),
+        width=pl.max_horizontal('put_width', 'call_width'),
+    ).filter(
+        pl.col('net_credit') >= min_credit
+    ).select(
+        pl.lit('iron_condor').alias('strategy'),
+        option_root='put_option_root',
+        expiration_date='put_expiration_date',
+        days_to_expiration='put_days_to_expiration',
+        long_put_symbol='put_long_symbol',
+        short_put_symbol='put_short_symbol',
+        short_call_symbol='call_short_symbol',
+        long_call_symbol='call_long_symbol',
+        long_put_strike='put_long_strike',
+        short_put_strike='put_short_strike',
+        short_call_strike='call_short_strike',
+        long_call_strike='call_long_strike',
+        width='width',
+        multiplier='put_multiplier',
+        net_credit='net_credit',
+        max_profit=pl.col('net_credit') * pl.col('put_multiplier'),
+        max_loss=(pl.col('width') - pl.col('net_credit')) * pl.col('put_multiplier'),
+        # a side whose width is covered by the total credit cannot lose, so it has no breakeven
+        breakeven_low=pl.when(pl.col('net_credit') < pl.col('put_width')).then(pl.col('put_short_strike') - pl.col('net_credit')),
+        breakeven_high=pl.when(pl.col('net_credit') < pl.col('call_width')).then(pl.col('call_short_strike') + pl.col('net_credit')),
+        net_delta=pl.col('put_net_delta') + pl.col('call_net_delta'),
+    )
+    return _returns(lf).collect()
+
+def butterflies(
+        chains : pl.DataFrame | pl.LazyFrame,
+        max_width : float = 10.0,
+        max_debit : float | None = None,
+        min_delta : float = 0.0,
+        max_delta : float = 1.0
+    ) -> pl.DataFrame:
+    """
+    Long butterflies: long one lower and one upper wing, short two bodies at the strike halfway between,
+    all of the same type and expiration
+
+    Keyword Arguments:
+        max_width : float -- maximum distance between the body and either wing
+        max_debit : float -- maximum net debit per share
+        min_delta : float -- minimum |delta| of the body
+        max_delta : float -- maximum |delta| of the body
+    """
+    logger.info('Enumerating butterflies')
+
+    legs = _legs(chains)
+    lower = _prefixed(_long(legs), 'lower_')
+    body = _prefixed(_short(legs, min_delta, max_delta).with_columns(floor=pl.col('strike') - max_width), 'body_')
+    upper = _prefixed(_long(legs), 'upper_')
+
+    lf = lower.join_where(
+        body,
+        *_same_series('lower_', 'body_'),
+        pl.col('body_strike') > pl.col('lower_strike'),
+        pl.col('body_floor') <= pl.col('lower_strike'),
+    ).with_columns(
+        upper_strike_key=2 * pl.col('body_strike_key') - pl.col('lower_strike_key'),
+    ).join(
+        upper,
+        left_on=[ *(f'lower_{key}' for key in _KEYS), 'upper_strike_key' ],
+        right_on=[ *(f'upper_{key}' for key in _KEYS), 'upper_strike_key' ],
+        how='inner'
+    ).with_columns(
+        net_credit=2 * pl.col('body_bid') - pl.col('lower_ask') - pl.col('upper_ask'),
+        width=pl.col('body_strike') - pl.col('lower_strike'),
+    ).filter(
+        pl.col('net_credit') < 0,
+        pl.lit(True) if max_debit is None else -pl.col('net_credit') <= max_debit,
+    ).select(
+        pl.lit('butterfly').alias('strategy'),
+        option_root='lower_option_root',
+        expiration_date='lower_expiration_date',
+        days_to_expiration='lower_days_to_expiration',
+        put_call='lower_put_call',
+        lower_symbol='lower_symbol',
+        body_symbol='body_symbol',
+        upper_symbol='upper_symbol',
+        lower_strike='lower_strike',
+        body_strike='body_strike',
+        upper_strike='upper_strike',
+        width='width',
+        multiplier='body_multiplier',
+        net_credit='net_credit',
+        max_profit=(pl.col('width') + pl.col('net_credit')) * pl.col('body_multiplier'),
+        max_loss=-pl.col('net_credit') * pl.col('body_multiplier'),
+        breakeven_low=pl.col('lower_strike') - pl.col('net_credit'),
+        breakeven_high=pl.col('upper_strike') + pl.col('net_credit'),
+        net_delta=pl.col('lower_delta') + pl.col('upper_delta') - 2 * pl.col('body_delta'),
+    )
+    return _returns(lf).collect()
+
+STRATEGIES = {
+    'vertical': verticals,
+    'iron_condor': iron_condors,
+    'butterfly': butterflies,
+}
+
+__all__ = ['STRATEGIES', 'butterflies', 'iron_condors', 'verticals']
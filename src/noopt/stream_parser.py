@@ -0,0 +1,127 @@
+""" Incremental parser of /chains response bodies with bounded memory """
+
+import codecs
+import json
+from typing import Iterable, Iterator
+
+
+_WHITESPACE = ' \t\n\r'
+_DELIMITERS = _WHITESPACE + ',:]}'
+_EXP_DATE_MAPS = ('callExpDateMap', 'putExpDateMap')
+
+class ChainStreamParser:
+    """
+    Incremental parser of a /chains response body. The body is read chunk by chunk and the
+    callExpDateMap/putExpDateMap objects are walked strike by strike, so at most one chunk plus one
+    batch of contracts is held in memory regardless of the size of the chain.
+
+    Top-level fields (symbol, underlyingPrice, ...) are collected into {header} as they are read.
+
+    Arguments:
+        chunks -- raw response body, e.g. requests.Response.iter_content(...)
+    """
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self.header = {}
+
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        self._decoder = json.JSONDecoder()
+        self._buf = ''
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """ Appends the next chunk to the buffer, False once the body is exhausted """
+        if self._eof:
+            return False
+
+        self._buf = self._buf[self._pos:]
+        self._pos = 0
+        for chunk in self._chunks:
+            text = self._utf8.decode(chunk)
+            if text:
+                self._buf += text
+                return True
+        self._buf += self._utf8.decode(b'', final=True)
+        self._eof = True
+        return False
+
+    def _peek(self) -> str:
+        """ Next non-whitespace character, without consuming it """
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                raise ValueError('Unexpected end of chain response')
+
+    def _expect(self, char: str) -> None:
+        found = self._peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' at offset {self._pos} of chain response, found '{found}'")
+        self._pos += 1
+
+    def _next_member(self, close: str) -> bool:
+        """ Consumes the separator before the next member of an object/array, False at its end """
+        char = self._peek()
+        if char == close:
+            self._pos += 1
+            return False
+        if char == ',':
+            self._pos += 1
+        return True
+
+    def _value(self):
+        """ Decodes the next complete JSON value, reading more chunks until it is fully buffered """
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # a number cut by a chunk boundary decodes as a shorter number, so only accept a value
+            # once the character after it is buffered and ends it
+            if (end == len(self._buf) or self._buf[end] not in _DELIMITERS) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def _key(self) -> str:
+        key = self._value()
+        self._expect(':')
+        return key
+
+    def strikes(self) -> Iterator[tuple[str, str, list[dict]]]:
+        """ Yields (map key, expiration key, contracts) for every strike, e.g. ('callExpDateMap', '2025-05-30:0', [...]) """
+        self._expect('{')
+        while self._next_member('}'):
+            key = self._key()
+            if key not in _EXP_DATE_MAPS:
+                self.header[key] = self._value()
+                continue
+
+            self._expect('{')
+            while self._next_member('}'):
+                expiration = self._key()
+                self._expect('{')
+                while self._next_member('}'):
+                    _ = self._key()
+                    yield key, expiration, self._value()
+
+    def batches(self, batch_size: int = 1000) -> Iterator[list[tuple[str, str, list[dict]]]]:
+        """ Groups strikes() into batches of at least {batch_size} contracts """
+        batch, size = [], 0
+        for strike in self.strikes():
+            batch.append(strike)
+            size += len(strike[2])
+            if size >= batch_size:
+                yield batch
+                batch, size = [], 0
+        if batch:
+            yield batch
+
+__all__ = ['ChainStreamParser']
@@ -0,0 +1,7 @@
+import os
+import sys
+
+
+# modules import each other flat (e.g. from config import config), as when run from src/noopt
+_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ os.path.join(_root, 'src', 'noopt'), os.path.join(_root, 'src', 'noopt', 'api') ]
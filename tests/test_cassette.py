@@ -0,0 +1,62 @@
+from cassette import ReplayServer, benchmark, record
+from config import config
+
+import os
+
+import pytest
+import requests
+
+
+_CHAINS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'chains.json')
+_PARAMS = { 'symbol': 'AAPL', 'fields': [ 'quote', 'fundamental' ], 'strike': None, 'strikeCount': 10 }
+
+def _response(url: str, content: bytes = b'{"ok": true}') -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response.url = url
+    response._content = content
+    response._content_consumed = True
+    return response
+
+def test_replay_matches_list_params(monkeypatch, tmp_path):
+    monkeypatch.setitem(config._params, 'record_dir', str(tmp_path))
+    record('GET', 'https://api.schwabapi.com/marketdata/v1/quotes', _PARAMS, _response('/marketdata/v1/quotes'))
+
+    with ReplayServer(str(tmp_path), latency=0.0) as server:
+        replayed = requests.get(f'{server.url}/marketdata/v1/quotes', params=_PARAMS, timeout=5)
+
+    assert replayed.status_code == 200
+    assert replayed.json() == { 'ok': True }
+    assert server.misses == 0
+
+def test_benchmark_restores_config(monkeypatch, tmp_path):
+    import data_api
+
+    def fail(symbols, **kwargs):
+        raise RuntimeError
+        yield
+
+    monkeypatch.setattr(data_api, 'chains_many', fail)
+    before = dict(config._params)
+    with pytest.raises(RuntimeError):
+        benchmark(str(tmp_path), [ 'AAPL' ])
+    assert config._params == before
+
+def test_benchmark_counts_failed_chains(monkeypatch, tmp_path):
+    import data_api
+
+    symbols = [ 'AAPL', 'AMD', 'MSFT', 'NVDA', 'QQQ', 'SPY', 'TSLA', 'XOM' ]
+    with open(_CHAINS, 'rb') as f:
+        content = f.read()
+    monkeypatch.setitem(config._params, 'record_dir', str(tmp_path))
+    for symbol in symbols:
+        url = 'https://api.schwabapi.com/marketdata/v1/chains'
+        record('GET', url, data_api._chains_params(symbol), _response(url, content))
+    monkeypatch.setitem(config._params, 'max_retries', 0)
+
+    result = benchmark(str(tmp_path), symbols, latency=0.0, error_rate=0.5, seed=1)
+
+    assert result['misses'] == 0
+    assert result['failed'] == result['errors'] > 0
+    assert result['chains'] == result['requests'] - result['errors'] > 0
+    assert result['chains'] + result['failed'] == len(symbols)
@@ -0,0 +1,85 @@
+import codegen
+from codegen import decoder
+from data_schemas import (
+    EquityResponse, ExpirationChain, ExtendedMarket, Fundamental, OptionChain, OptionContract, QuoteEquity,
+    ReferenceEquity, RegularMarket, key_map
+)
+import validation
+
+import json
+import os
+
+from pydantic import BaseModel
+import pytest
+
+
+_DATA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+def _load(name: str) -> dict:
+    with open(os.path.join(_DATA, name), 'rb') as f:
+        return json.load(f)
+
+def _quote_records() -> list[tuple[type, dict]]:
+    schemas = {
+        'extended': ExtendedMarket,
+        'fundamental': Fundamental,
+        'quote': QuoteEquity,
+        'reference': ReferenceEquity,
+        'regular': RegularMarket
+    }
+    records = []
+    for equity in _load('quotes.json').values():
+        records.append((EquityResponse, equity))
+        records.extend((schemas[k], v) for k, v in equity.items() if k in schemas)
+    return records
+
+def _chain_records() -> list[tuple[type, dict]]:
+    response = _load('chains.json')
+    return [ (OptionChain, response) ] + [
+        (OptionContract, contract)
+        for key in ('callExpDateMap', 'putExpDateMap')
+        for strikes in response[key].values()
+        for contracts in strikes.values()
+        for contract in contracts
+    ]
+
+def _expiration_records() -> list[tuple[type, dict]]:
+    return [ (ExpirationChain, _load('expirationchain.json')) ]
+
+RECORDS = [ *_quote_records(), *_chain_records(), *_expiration_records() ]
+
+@pytest.mark.parametrize('model', sorted({ model for model, _ in RECORDS }, key=lambda model: model.__name__))
+def test_generated_matches_reflective(model):
+    for schema, record in RECORDS:
+        if schema is model:
+            generated = decoder(model)(record)
+            assert isinstance(generated, model)
+            assert generated == validation._snake(model, record, construct=True)
+
+@pytest.mark.parametrize('model', sorted({ model for model, _ in RECORDS }, key=lambda model: model.__name__))
+def test_every_known_key_is_decoded(model):
+    keys, fields = key_map(model), model.model_fields
+    for schema, record in RECORDS:
+        if schema is model:
+            generated = decoder(model)(record)
+            expected = { keys[key] for key in record } & set(fields)
+            assert generated.model_fields_set == expected
+            for name in expected:
+                assert getattr(generated, name) is not None
+
+class _First(BaseModel):
+    value: float
+
+class _Second(BaseModel):
+    value: float
+
+def test_stale_decoder_is_regenerated_alone():
+    first, second = decoder(_First), decoder(_Second)
+    assert first({ 'value': 1, 'newKey': 2 }).value == 1.0  # learns newKey, marks _First stale
+
+    assert decoder(_Second) is second
+    regenerated = decoder(_First)
+    assert regenerated is not first
+    assert 'newKey' in regenerated.__source__
+    assert decoder(_First) is regenerated
+    assert _First not in codegen._stale
@@ -0,0 +1,25 @@
+from config import config
+import parse_pool
+import parser
+
+import json
+import os
+
+import pytest
+
+
+_CHAINS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'chains.json')
+
+@pytest.fixture
+def response() -> dict:
+    with open(_CHAINS, 'rb') as f:
+        return json.load(f)
+
+def test_parse_chains_across_processes(monkeypatch, response):
+    monkeypatch.setattr(config, '_params', { **config._params, 'parse_processes': 2, 'parse_threshold': 1 })
+    try:
+        options = parse_pool.parse_chains(response)
+    finally:
+        parse_pool.close_pool()
+
+    assert options.to_dictl() == parser.parse_chains(response).to_dictl()
@@ -0,0 +1,40 @@
+from parser import CHAIN_CATEGORIES, categorize_chain, parse_chains_frame
+
+import json
+import os
+
+import polars as pl
+from polars.exceptions import InvalidOperationError
+import pytest
+
+
+_CHAINS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'chains.json')
+
+@pytest.fixture
+def response() -> dict:
+    with open(_CHAINS, 'rb') as f:
+        return json.load(f)
+
+def _first_contract(response: dict) -> dict:
+    strikes = next(iter(response['callExpDateMap'].values()))
+    return next(iter(strikes.values()))[0]
+
+def test_categories(response):
+    df = parse_chains_frame(response)
+    for name, dtype in CHAIN_CATEGORIES.items():
+        assert df.schema[name] == dtype
+    assert df['underlying_symbol'].cast(pl.String).unique().to_list() == [ response['symbol'] ]
+
+def test_unknown_enum_value_raises_in_both_paths(response):
+    _first_contract(response)['expirationType'] = 'X'
+    with pytest.raises(InvalidOperationError):
+        parse_chains_frame(response)
+
+    strings = pl.DataFrame({ 'expiration_type': [ 'W', 'X' ] })
+    with pytest.raises(InvalidOperationError):
+        categorize_chain(strings)
+
+def test_open_vocabulary_is_kept(response):
+    _first_contract(response)['exchangeName'] = 'NEW'
+    df = parse_chains_frame(response)
+    assert 'NEW' in df['exchange_name'].cast(pl.String).to_list()
@@ -0,0 +1,54 @@
+from parser import parse_chains_frame
+from pricing import greeks, implied_volatility, price, price_chain
+
+import json
+import os
+
+import numpy as np
+import polars as pl
+import pytest
+
+
+_CHAINS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'chains.json')
+
+@pytest.fixture(scope='module')
+def priced() -> pl.DataFrame:
+    with open(_CHAINS, 'rb') as f:
+        response = json.load(f)
+    df = parse_chains_frame(response)
+    return price_chain(df, response['underlyingPrice'], response['interestRate']).with_columns(
+        underlying_price=pl.lit(response['underlyingPrice'])
+    )
+
+def test_put_call_parity():
+    S, K, T, r, sigma, q = 100.0, np.array([90.0, 100.0, 110.0]), 0.5, 0.04, 0.25, 0.01
+    call, put = price(S, K, T, r, sigma, True, q), price(S, K, T, r, sigma, False, q)
+    np.testing.assert_allclose(call - put, S * np.exp(-q * T) - K * np.exp(-r * T), atol=1e-6)
+
+def test_implied_volatility_round_trip():
+    K, is_call = np.array([80.0, 100.0, 120.0]), np.array([False, True, True])
+    target = price(100.0, K, 0.25, 0.05, 0.3, is_call)
+    np.testing.assert_allclose(implied_volatility(target, 100.0, K, 0.25, 0.05, is_call), 0.3, atol=1e-4)
+
+def test_expiration_day(priced):
+    expiring = priced.filter(pl.col('days_to_expiration') == 0)
+    assert expiring.height > 0
+
+    intrinsic = pl.when(pl.col('put_call') == 'CALL') \
+                  .then(pl.col('underlying_price') - pl.col('strike_price')) \
+                  .otherwise(pl.col('strike_price') - pl.col('underlying_price')) \
+                  .clip(lower_bound=0)
+    np.testing.assert_allclose(expiring['bs_price'].to_numpy(), expiring.select(intrinsic).to_series().to_numpy())
+    assert (expiring['bs_theta'] == 0).all()
+    assert (expiring['bs_vega'] == 0).all()
+    assert (expiring['bs_gamma'] == 0).all()
+    assert expiring['bs_implied_volatility'].is_null().all()
+    assert expiring['bs_delta'].is_in([ -1.0, 0.0, 1.0 ]).all()
+
+    # Schwab's own expiration-day thetas are a few cents at most
+    assert ((expiring['bs_theta'] - expiring['theta']).abs() < 0.1).all()
+
+def test_expired_greeks_scalar():
+    g = greeks(100.0, 95.0, 0.0, 0.05, 0.2, False)
+    assert float(g['delta']) == 0.0 and float(g['theta']) == 0.0 and float(g['vega']) == 0.0
+    assert float(price(100.0, 95.0, 0.0, 0.05, 0.2, True)) == 5.0
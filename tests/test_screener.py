@@ -0,0 +1,58 @@
+from models import Equity, Quote
+from parser import parse_chains_frame
+import screener
+from screener import COVERED, Screener, screen_symbols
+
+import json
+import os
+
+import polars as pl
+import pytest
+import requests
+
+
+_CHAINS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'chains.json')
+_METRIC = 'c_annualized_return_if_unchanged'
+
+@pytest.fixture(scope='module')
+def response() -> dict:
+    with open(_CHAINS, 'rb') as f:
+        return json.load(f)
+
+@pytest.fixture(scope='module')
+def frame(response) -> pl.DataFrame:
+    return parse_chains_frame(response)
+
+def test_covered_skips_non_standard(frame, response):
+    ask = response['underlyingPrice']
+    best = Screener(k=1).rank(COVERED, _METRIC)
+    best.add(frame, ask)
+    symbol = best.top(COVERED)['symbol'][0]
+
+    adjusted = frame.with_columns(non_standard=pl.col('non_standard') | (pl.col('symbol') == symbol))
+    screened = Screener(k=len(frame)).rank(COVERED, _METRIC)
+    screened.add(adjusted, ask)
+
+    assert len(screened.top(COVERED)) > 0
+    assert symbol not in screened.top(COVERED)['symbol'].to_list()
+
+def test_screen_symbols_skips_failures(monkeypatch, frame, response):
+    def chains_frame_many(symbols, return_exceptions=False, **kwargs):
+        assert return_exceptions
+        yield 'AAPL', frame
+        yield '$SPX', frame
+        yield 'MSFT', requests.HTTPError('503 Server Error')
+
+    equity = Equity(symbol='AAPL')
+    equity.quote = Quote(askPrice=response['underlyingPrice'])
+    monkeypatch.setattr(screener, 'quotes', lambda symbols, **kwargs: [ equity ])
+    monkeypatch.setattr(screener, 'chains_frame_many', chains_frame_many)
+
+    covered = Screener(k=len(frame)).rank(COVERED, _METRIC)
+    screen_symbols(covered, [ 'AAPL', '$SPX', 'MSFT' ])
+
+    reference = Screener(k=len(frame)).rank(COVERED, _METRIC)
+    reference.add(frame, response['underlyingPrice'])
+
+    assert covered.seen == 2
+    assert covered.top(COVERED).equals(reference.top(COVERED))
@@ -0,0 +1,65 @@
+from config import config
+from rate_limiter import rate_limiter
+import shared_api
+from shared_api import APICategory, api_request
+
+import pytest
+import requests
+
+
+class _Session:
+    """ Stands in for the pooled session, answering every request with {statuses} in turn """
+
+    def __init__(self, *statuses: int):
+        self.statuses = list(statuses)
+        self.calls = 0
+
+    def request(self, method, url, **kwargs) -> requests.Response:
+        status = self.statuses[min(self.calls, len(self.statuses) - 1)]
+        self.calls += 1
+
+        response = requests.Response()
+        response.status_code = status
+        response.url = url
+        response._content = b'{"errors": [{"status": "%d"}]}' % status if status >= 400 else b'{"ok": true}'
+        response._content_consumed = True
+        return response
+
+@pytest.fixture(autouse=True)
+def _live(monkeypatch):
+    monkeypatch.setattr(config, '_params', {
+        **config._params, 'use_cache': False, 'cache_responses': False, 'record_dir': '', 'backoff_factor': 0.0
+    })
+
+def _serve(monkeypatch, *statuses: int) -> _Session:
+    session = _Session(*statuses)
+    monkeypatch.setattr(shared_api, 'get_session', lambda: session)
+    return session
+
+def test_exhausted_retry_raises(monkeypatch):
+    session = _serve(monkeypatch, 503)
+    with pytest.raises(requests.HTTPError):
+        api_request(APICategory.DATA, '/quotes')
+    assert session.calls == config.max_retries + 1
+
+def test_retry_succeeds(monkeypatch):
+    session = _serve(monkeypatch, 429, 502, 200)
+    assert api_request(APICategory.DATA, '/quotes') == { 'ok': True }
+    assert session.calls == 3
+
+def test_every_attempt_takes_a_token(monkeypatch):
+    acquired = []
+    monkeypatch.setattr(rate_limiter, 'acquire', lambda priority, name: acquired.append(name) or 0.0)
+    session = _serve(monkeypatch, 503, 503, 200)
+    api_request(APICategory.DATA, '/quotes')
+    assert len(acquired) == session.calls == 3
+
+def test_post_is_not_retried(monkeypatch):
+    session = _serve(monkeypatch, 503, 200)
+    with pytest.raises(requests.HTTPError):
+        api_request(APICategory.TRADER, '/accounts/0/orders', method='POST')
+    assert session.calls == 1
+
+def test_success_is_decoded(monkeypatch):
+    _serve(monkeypatch, 200)
+    assert api_request(APICategory.DATA, '/quotes') == { 'ok': True }
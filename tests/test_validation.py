@@ -0,0 +1,54 @@
+from config import config
+from data_schemas import OptionChain, OptionContract, PutCall
+from validation import decode
+
+import json
+import os
+
+import pytest
+
+
+_CHAINS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'chains.json')
+
+@pytest.fixture(scope='module')
+def response() -> dict:
+    with open(_CHAINS, 'rb') as f:
+        return json.load(f)
+
+def _decode(monkeypatch, mode: str, response: dict) -> OptionChain:
+    monkeypatch.setitem(config._params, 'validation', mode)
+    return decode(OptionChain, response)  # type: ignore
+
+def _contracts(chain: OptionChain) -> list[OptionContract]:
+    return [
+        contract
+        for exp_date_map in (chain.call_exp_date_map, chain.put_exp_date_map)
+        for strikes in exp_date_map.values()
+        for contracts in strikes.values()
+        for contract in contracts
+    ]
+
+def test_trusted_equals_strict(monkeypatch, response):
+    trusted = _decode(monkeypatch, 'trusted', response)
+    strict = _decode(monkeypatch, 'strict', response)
+    assert trusted == strict
+    assert trusted.model_dump() == strict.model_dump()
+
+@pytest.mark.parametrize('mode', ['trusted', 'strict'])
+def test_wire_names_fill_fields(monkeypatch, response, mode):
+    contracts = _contracts(_decode(monkeypatch, mode, response))
+    wire = [
+        contract
+        for exp_date_map in (response['callExpDateMap'], response['putExpDateMap'])
+        for strikes in exp_date_map.values()
+        for contracts_ in strikes.values()
+        for contract in contracts_
+    ]
+    assert len(contracts) == len(wire)
+    for contract, data in zip(contracts, wire):
+        assert (contract.bid_price, contract.ask_price, contract.last_price, contract.mark_price) == \
+               (data['bid'], data['ask'], data['last'], data['mark'])
+        assert (contract.is_in_the_money, contract.is_mini, contract.is_non_standard, contract.is_penny_pilot) == \
+               (data['inTheMoney'], data['mini'], data['nonStandard'], data['pennyPilot'])
+        assert contract.put_call is PutCall[data['putCall']]
+        assert len(contract.option_deliberables_list) == len(data['optionDeliverablesList'])